@@ -0,0 +1,60 @@
+"""
+高斯投影计算引擎基准测试：经典幂级数公式('gauss')与Krüger n级数('kruger')
+
+用法:
+    python benchmarks/bench_projection.py [点数] [重复次数]
+
+精度以Krüger引擎的正反算往返误差及两引擎之间的差值给出。
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from function.geodetic import BLH2xy, xy2BLH
+
+def _best_time(func, repeat):
+    """重复执行取最短耗时(秒)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(n_points=1000000, repeat=5, ellipsoid='CGCS2000'):
+    rng = np.random.default_rng(0)
+    central_meridian = np.radians(117.0)
+    B = np.radians(rng.uniform(18.0, 54.0, n_points))
+    L = central_meridian + np.radians(rng.uniform(-3.0, 3.0, n_points))
+
+    print(f"椭球: {ellipsoid}  点数: {n_points}  重复: {repeat}  经差范围: ±3°")
+    print(f"{'引擎':<8}{'正算(ms)':>12}{'反算(ms)':>12}{'正算(百万点/秒)':>18}")
+
+    results = {}
+    for engine in ('gauss', 'kruger'):
+        y, x = BLH2xy(B, L, ellipsoid, central_meridian, engine=engine)
+        t_fwd = _best_time(lambda: BLH2xy(B, L, ellipsoid, central_meridian, engine=engine), repeat)
+        t_inv = _best_time(lambda: xy2BLH(x, y, ellipsoid, central_meridian, engine=engine), repeat)
+        results[engine] = (y, x)
+        print(f"{engine:<8}{t_fwd*1e3:>12.1f}{t_inv*1e3:>12.1f}{n_points/t_fwd/1e6:>18.2f}")
+
+    # 精度对比(纬度/经度误差按地球半径换算为米)
+    radius = 6371000.0
+    print()
+    for engine in ('gauss', 'kruger'):
+        y, x = results[engine]
+        b, l = xy2BLH(x, y, ellipsoid, central_meridian, engine=engine)
+        err = radius * max(np.max(np.abs(b - B)), np.max(np.abs((l - L) * np.cos(B))))
+        print(f"{engine:<8}正反算往返最大误差: {err*1e3:.6f} mm")
+
+    y_g, x_g = results['gauss']
+    y_k, x_k = results['kruger']
+    print(f"两引擎正算最大差值: 东 {np.max(np.abs(y_g - y_k)):.4f} m, 北 {np.max(np.abs(x_g - x_k)):.4f} m")
+
+if __name__ == '__main__':
+    args = [int(v) for v in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,290 @@
+"""
+命令行批量坐标转换工具，不依赖图形界面，可在无显示环境的服务器上运行
+
+用法示例:
+    python src/coordtrans.py points.txt out.txt --params 七参数.json \
+        --source-type BLH --source-datum WGS84 --target-type xy --target-datum Beijing54 --zone 19
+
+输入文件每行一个点，依次为三个坐标分量(可用 --id 指定首列为点号)：
+    BLH: 纬度 经度 大地高      XYZ: X Y Z      xy: 北坐标x 东坐标y 大地高
+输出文件格式相同，分量含义由 --target-type 决定。
+文件按 --chunk-size 行一块流式读取、转换、写出，不会整体读入内存。
+
+输入输出文件扩展名为 .npy 或 .bin/.raw/.dat(无文件头的float64数组)时按二进制处理：
+文件以内存映射方式打开，数组形状为(n,3)，各列视图直接参与计算并写入输出文件，
+经纬度以弧度存储，不支持点号列。
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from function.ellipsoid import ELLIPSOIDS
+from function.geodetic import PROJECTION_ENGINES, XYZ2BLH_ALGORITHMS, _central_meridian_of_zone
+from function.pipeline import COORD_TYPES
+from function.seven_par import invert_seven_parameters
+from function.four_par import invert_four_parameters
+from function.parallel import (BACKENDS, seven_param_engine, four_par_engine,
+                               parallel_seven_param_pipeline, parallel_transform_four_par)
+from function.streaming import DEFAULT_CHUNK_ROWS, stream_file
+from function.binary_io import binary_format_of, open_coordinates, create_coordinates, column_views
+
+# 角度单位
+ANGLE_UNITS = ('deg', 'dms', 'rad')
+
+def load_parameters(path):
+    """
+    读取转换参数文件
+
+    支持界面保存的配置文件(含 'config_type' 与 'transformation_parameters')、
+    仅含参数的字典({"DX": ..., "K": ...} 或 {"a": ..., "dy": ...})以及7个或4个数值组成的列表。
+
+    参数:
+    path: str, JSON参数文件路径
+
+    返回:
+    tuple: ('seven', numpy.ndarray shape (7,)) 或 ('four', dict)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict) and 'transformation_parameters' in data:
+        data = data['transformation_parameters']
+
+    if isinstance(data, list):
+        if len(data) == 7:
+            return 'seven', np.array(data, dtype=np.float64)
+        if len(data) == 4:
+            return 'four', dict(zip(('a', 'b', 'dx', 'dy'), (float(v) for v in data)))
+    elif isinstance(data, dict):
+        seven_keys = ('DX', 'DY', 'DZ', 'WX', 'WY', 'WZ', 'K')
+        four_keys = ('a', 'b', 'dx', 'dy')
+        if all(data.get(k) is not None for k in seven_keys):
+            return 'seven', np.array([data[k] for k in seven_keys], dtype=np.float64)
+        if all(data.get(k) is not None for k in four_keys):
+            return 'four', {k: float(data[k]) for k in four_keys}
+
+    raise ValueError(f"无法识别的参数文件: {path}，需要七参数 DX~K 或四参数 a、b、dx、dy")
+
+def parse_angle(values, unit):
+    """将角度文本数组转换为弧度，unit为 'deg'、'dms'(度:分:秒) 或 'rad'"""
+    if unit == 'dms':
+        parts = np.char.partition(np.char.strip(values.astype(str)), ':')
+        degrees = parts[:, 0].astype(np.float64)
+        rest = np.char.partition(parts[:, 2], ':')
+        minutes = np.where(rest[:, 0] == '', '0', rest[:, 0]).astype(np.float64)
+        seconds = np.where(rest[:, 2] == '', '0', rest[:, 2]).astype(np.float64)
+        # 负号只写在度上，如 -023:10:24
+        sign = np.where(np.char.startswith(parts[:, 0], '-'), -1.0, 1.0)
+        return np.radians(sign * (np.abs(degrees) + minutes/60 + seconds/3600))
+    values = values.astype(np.float64)
+    return values if unit == 'rad' else np.radians(values)
+
+def format_angle(values, unit):
+    """将弧度数组格式化为角度文本数组"""
+    if unit == 'rad':
+        return np.char.mod('%.12f', values)
+    degrees = np.degrees(values)
+    if unit == 'deg':
+        return np.char.mod('%.10f', degrees)
+    sign = np.where(degrees < 0, '-', '')
+    degrees = np.abs(degrees)
+    d = np.floor(degrees)
+    m = np.floor((degrees - d) * 60)
+    s = (degrees - d - m/60) * 3600
+    # 秒值四舍五入后可能进位到60
+    carry = np.round(s, 6) >= 60
+    s = np.where(carry, 0.0, s)
+    m = np.where(carry, m + 1, m)
+    carry = m >= 60
+    m = np.where(carry, 0, m)
+    d = np.where(carry, d + 1, d)
+    text = np.char.add(np.char.mod('%03d:', d), np.char.mod('%02d:', m))
+    return np.char.add(sign, np.char.add(text, np.char.mod('%09.6f', s)))
+
+class Converter:
+    """
+    按命令行选项构造的转换器，对一批坐标分量完成整条转换链
+
+    使用进程池时，工作进程与共享内存在各块之间复用，用完后须调用 close()。
+
+    参数:
+    options: argparse.Namespace, 命令行选项(见 build_parser)
+    """
+
+    def __init__(self, options):
+        self.options = options
+        if options.params:
+            self.kind, self.parameters = load_parameters(options.params)
+        else:
+            # 无参数文件时只做坐标形式与椭球的换算
+            self.kind, self.parameters = 'seven', np.zeros(7)
+
+        if options.inverse:
+            if self.kind == 'seven':
+                self.parameters = invert_seven_parameters(self.parameters, options.rigorous)
+            else:
+                self.parameters = invert_four_parameters(self.parameters)
+
+        if self.kind == 'four' and (options.source_type != 'xy' or options.target_type != 'xy'):
+            raise ValueError("四参数只能用于平面坐标(xy)之间的转换")
+
+        if options.zone is not None:
+            self.central_meridian = float(_central_meridian_of_zone(options.zone, options.degree_belt))
+        elif options.central_meridian is not None:
+            self.central_meridian = np.radians(options.central_meridian)
+        else:
+            self.central_meridian = None
+        # 输出文件不含带号，逐点自动分带的结果无法区分所属投影带，因此目标为平面坐标时同样必须指定
+        if 'xy' in (options.source_type, options.target_type) and self.kind == 'seven' and self.central_meridian is None:
+            raise ValueError("源或目标坐标为平面坐标时必须用 --zone 或 --central-meridian 指定中央经线")
+
+        # 进程池引擎只创建一次，参数在工作进程启动时载入
+        self.pool = None
+        if options.parallel == 'process' and options.workers != 1:
+            if self.kind == 'four':
+                self.pool = four_par_engine(self.parameters, options.workers, options.chunk_size)
+            else:
+                self.pool = seven_param_engine(
+                    self.parameters, options.source_datum, options.target_datum,
+                    options.source_type, options.target_type,
+                    self.central_meridian, self.central_meridian, options.degree_belt,
+                    options.algorithm, options.engine, options.rigorous, options.workers, options.chunk_size
+                )
+
+    def close(self):
+        """结束进程池并释放共享内存"""
+        if self.pool is not None:
+            self.pool.close()
+
+    def parse(self, columns):
+        """将三列文本转换为 (c1, c2, c3) 浮点数组，经纬度转换为弧度"""
+        if self.options.source_type == 'BLH':
+            return (parse_angle(columns[:, 0], self.options.angle_unit),
+                    parse_angle(columns[:, 1], self.options.angle_unit),
+                    columns[:, 2].astype(np.float64))
+        return tuple(columns[:, i].astype(np.float64) for i in range(3))
+
+    def format(self, c1, c2, c3):
+        """将转换结果格式化为三列文本"""
+        if self.options.target_type == 'BLH':
+            first = (format_angle(c1, self.options.angle_unit), format_angle(c2, self.options.angle_unit))
+        else:
+            first = (np.char.mod('%.4f', c1), np.char.mod('%.4f', c2))
+        return np.stack(first + (np.char.mod('%.4f', c3),), axis=1)
+
+    def transform(self, c1, c2, c3, out=None):
+        """对三列坐标分量完成转换，返回目标坐标的三个分量，提供out时直接写入其中"""
+        options = self.options
+        if self.kind == 'four':
+            xy_out = None if out is None else out[:2]
+            if self.pool is not None:
+                x, y = self.pool.run((c1, c2), xy_out)
+            else:
+                x, y = parallel_transform_four_par(c1, c2, self.parameters, workers=options.workers,
+                                                   out=xy_out, backend=options.parallel)
+            if out is None:
+                return x, y, c3
+            out[2][...] = c3
+            return out
+        if self.pool is not None:
+            return self.pool.run((c1, c2, c3), out)
+        return parallel_seven_param_pipeline(
+            c1, c2, c3, self.parameters, options.source_datum, options.target_datum,
+            options.source_type, options.target_type,
+            self.central_meridian, self.central_meridian, options.degree_belt,
+            algorithm=options.algorithm, engine=options.engine, rigorous=options.rigorous,
+            workers=options.workers, out=out, backend=options.parallel
+        )
+
+    def convert(self, rows):
+        """转换一块文本行(可含点号列)，返回待写出的文本行"""
+        first = 1 if self.options.id else 0
+        result = self.format(*self.transform(*self.parse(rows[:, first:])))
+        return np.column_stack((rows[:, 0], result)) if first else result
+
+def build_parser():
+    datums = list(ELLIPSOIDS)
+    parser = argparse.ArgumentParser(
+        prog='coordtrans',
+        description="WGS84/北京54等坐标系之间的批量坐标转换(命令行版，不加载图形界面)"
+    )
+    parser.add_argument('input', help="输入坐标文件，'-' 表示标准输入")
+    parser.add_argument('output', nargs='?', default='-', help="输出坐标文件，默认为标准输出")
+    parser.add_argument('--params', help="转换参数文件(JSON)，可直接使用界面保存的七参数/四参数文件")
+    parser.add_argument('--inverse', action='store_true', help="使用参数的逆变换(反方向转换)")
+    parser.add_argument('--source-type', choices=COORD_TYPES, default='BLH', help="源坐标类型(默认BLH)")
+    parser.add_argument('--target-type', choices=COORD_TYPES, default='BLH', help="目标坐标类型(默认BLH)")
+    parser.add_argument('--source-datum', choices=datums, default='WGS84', help="源椭球(默认WGS84)")
+    parser.add_argument('--target-datum', choices=datums, default='Beijing54', help="目标椭球(默认Beijing54)")
+    parser.add_argument('--zone', type=int, help="投影带号，源或目标为平面坐标时必须指定(或用 --central-meridian)")
+    parser.add_argument('--central-meridian', type=float, help="中央经线(度)，与 --zone 二选一")
+    parser.add_argument('--degree-belt', type=int, choices=(3, 6), default=6, help="投影带宽(默认6度带)")
+    parser.add_argument('--angle-unit', choices=ANGLE_UNITS,
+                        help="文本文件的经纬度单位(默认十进制度)，二进制文件固定为弧度")
+    parser.add_argument('--engine', choices=PROJECTION_ENGINES, default='gauss', help="高斯投影计算引擎")
+    parser.add_argument('--algorithm', choices=XYZ2BLH_ALGORITHMS, default='iterative', help="XYZ转BLH算法")
+    parser.add_argument('--rigorous', action='store_true', help="七参数使用严密旋转矩阵")
+    parser.add_argument('--delimiter', help="列分隔符，默认为任意空白")
+    parser.add_argument('--skip-header', type=int, default=0, help="跳过开头的行数")
+    parser.add_argument('--id', action='store_true', help="首列为点号，原样输出")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"每块读取的行数，内存占用与之成正比(默认{DEFAULT_CHUNK_ROWS})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="并行计算的进程(线程)数，0表示CPU核数(默认1，不并行)")
+    parser.add_argument('--parallel', choices=BACKENDS, default='process',
+                        help="并行方式：process为进程池(大批量)，thread为线程池(中等批量，开销小)")
+    return parser
+
+def convert_binary(converter, source, target, chunk_size):
+    """
+    二进制文件之间的转换：输入输出均为内存映射数组，按块取行切片的列视图直接计算，
+    结果写入输出文件，不经过文本解析，也不复制输入数据
+    """
+    source_array = open_coordinates(source)
+    target_array = create_coordinates(target, len(source_array))
+    for start in range(0, len(source_array), chunk_size):
+        rows = slice(start, start + chunk_size)
+        converter.transform(*column_views(source_array[rows]), out=column_views(target_array[rows]))
+    if isinstance(target_array, np.memmap):
+        target_array.flush()
+    return len(source_array)
+
+def main(argv=None):
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    try:
+        binary = [binary_format_of(path) is not None for path in (options.input, options.output)]
+        if any(binary):
+            if not all(binary):
+                raise ValueError("二进制格式只能与二进制格式互相转换，输入输出应同为 .npy/.bin/.raw/.dat")
+            if options.angle_unit not in (None, 'rad') or options.id:
+                raise ValueError("二进制文件的经纬度固定为弧度，且不支持点号列")
+            options.angle_unit = 'rad'
+        elif options.angle_unit is None:
+            options.angle_unit = 'deg'
+        if options.chunk_size <= 0:
+            raise ValueError("--chunk-size必须为正整数")
+        if options.workers < 0:
+            raise ValueError("--workers不能为负数")
+
+        converter = Converter(options)
+        try:
+            if all(binary):
+                convert_binary(converter, options.input, options.output, options.chunk_size)
+            else:
+                source = sys.stdin if options.input == '-' else options.input
+                target = sys.stdout if options.output == '-' else options.output
+                n_columns = 4 if options.id else 3
+                stream_file(source, target, converter.convert, n_columns, options.chunk_size,
+                            options.delimiter, options.skip_header)
+        finally:
+            converter.close()
+    except (OSError, ValueError) as e:
+        print(f"coordtrans: 错误: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+
+# 支持的二进制坐标文件格式
+BINARY_FORMATS = (
+    'npy',  # NumPy .npy 文件，带数据类型与形状的文件头
+    'raw',  # 无文件头的原始二进制数组，按行存储，每行n_columns个float64
+)
+
+def binary_format_of(path):
+    """按扩展名判断二进制格式，.npy 为 'npy'，.bin/.raw/.dat 为 'raw'，其余返回None(文本文件)"""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.npy':
+        return 'npy'
+    if extension in ('.bin', '.raw', '.dat'):
+        return 'raw'
+    return None
+
+def open_coordinates(path, n_columns=3, file_format=None, dtype=np.float64, mode='r'):
+    """
+    以内存映射方式打开二进制坐标文件，不把文件读入内存
+
+    参数:
+    path: str, 文件路径
+    n_columns: int, 每个点的分量个数，raw格式按此确定形状
+    file_format: str, 'npy' 或 'raw'，为None时按扩展名判断
+    dtype: numpy.dtype, raw格式的数据类型，npy格式以文件头为准
+    mode: str, 'r' 只读，'r+' 可原地修改
+
+    返回:
+    numpy.memmap: shape (n, n_columns) 的坐标数组，按需从磁盘调页
+    """
+    file_format = _check_format(path, file_format)
+    if file_format == 'npy':
+        array = np.load(path, mmap_mode=mode)
+        if array.ndim != 2 or array.shape[1] != n_columns:
+            raise ValueError(f"{path} 的形状为{array.shape}，应为(n,{n_columns})")
+        return array
+
+    itemsize = np.dtype(dtype).itemsize * n_columns
+    size = os.path.getsize(path)
+    if size % itemsize:
+        raise ValueError(f"{path} 的大小({size}字节)不是每点{itemsize}字节的整数倍")
+    if size == 0:
+        # 空文件无法映射
+        return np.empty((0, n_columns), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(size // itemsize, n_columns))
+
+def create_coordinates(path, n_points, n_columns=3, file_format=None, dtype=np.float64):
+    """
+    创建内存映射的二进制坐标输出文件，结果可直接写入其中
+
+    参数:
+    path: str, 文件路径，已存在时被覆盖
+    n_points: int, 点数
+    n_columns: int, 每个点的分量个数
+    file_format: str, 'npy' 或 'raw'，为None时按扩展名判断
+    dtype: numpy.dtype, 数据类型
+
+    返回:
+    numpy.memmap: shape (n_points, n_columns) 的可写坐标数组，写完后调用 flush()
+    """
+    file_format = _check_format(path, file_format)
+    shape = (n_points, n_columns)
+    if file_format == 'npy':
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    if n_points == 0:
+        open(path, 'wb').close()
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+
+def column_views(array):
+    """
+    将 (n,k) 坐标数组拆分为k个列视图，不复制数据
+
+    各列视图可直接作为转换函数的输入或out参数，数组为内存映射时读写直接作用于文件。
+    """
+    return tuple(array[:, i] for i in range(array.shape[1]))
+
+def _check_format(path, file_format):
+    """确定并检查二进制格式"""
+    if file_format is None:
+        file_format = binary_format_of(path)
+    if file_format not in BINARY_FORMATS:
+        raise ValueError(f"无法确定 {path} 的二进制格式，可选 {BINARY_FORMATS}")
+    return file_format
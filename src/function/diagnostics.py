@@ -0,0 +1,57 @@
+import numpy as np
+
+# Baarda数据探测w检验的临界值(显著性水平α=0.001，双侧)
+W_TEST_CRITICAL = 3.29
+
+def point_diagnostics(B, Q, V, sigma0, dim):
+    """
+    由误差方程系数矩阵与法方程逆阵计算各公共点的粗差诊断量
+    
+    帽子矩阵 H = B·Q·Bᵀ 只计算每个点对应的 dim×dim 对角块，不形成完整的 (dim·n)² 矩阵，
+    复用参数解算时的法方程逆阵，无需去掉各点逐一重新解算。
+    
+    参数:
+    B: numpy.ndarray, shape (dim·n, u), 误差方程系数矩阵，每个点占连续的dim行
+    Q: numpy.ndarray, shape (u, u), 法方程矩阵的逆 N⁻¹
+    V: numpy.ndarray, shape (dim·n,), 残差 V = B·x - L
+    sigma0: float, 单位权中误差
+    dim: int, 每个点的观测个数(七参数为3，四参数为2)
+    
+    返回:
+    dict: 包含以下键值:
+        'leverage': numpy.ndarray, shape (n,)
+            杠杆值，即帽子矩阵对角块的迹，全部点之和等于参数个数
+        'loo_residuals': numpy.ndarray, shape (n,dim)
+            留一残差 (I - Hᵢᵢ)⁻¹·vᵢ，等于去掉该点重新解算后该点的残差；
+            该点为必要观测(无多余观测)时为nan
+        'standardized_residuals': numpy.ndarray, shape (n,dim)
+            Baarda标准化残差 w = v / (σ0·√rⱼⱼ)，rⱼⱼ = 1 - hⱼⱼ 为多余观测分量；
+            |w| 超过 W_TEST_CRITICAL 时该观测可能含有粗差
+    """
+    n = V.size // dim
+    B = B.reshape(n, dim, -1)
+    v = V.reshape(n, dim)
+    
+    # 各点的帽子矩阵对角块 Hᵢᵢ = Bᵢ·Q·Bᵢᵀ 及多余观测分量矩阵 Rᵢᵢ = I - Hᵢᵢ
+    H = np.einsum('nik,kl,njl->nij', B, Q, B)
+    R = np.eye(dim) - H
+    leverage = np.trace(H, axis1=1, axis2=2)
+    
+    # 留一残差，Rᵢᵢ奇异(必要观测)的点无法留一
+    singular = np.linalg.eigvalsh(R).min(axis=1) < 1e-10
+    R[singular] = np.eye(dim)
+    loo_residuals = np.linalg.solve(R, v[..., np.newaxis])[..., 0]
+    loo_residuals[singular] = np.nan
+    
+    # 标准化残差
+    r = 1 - np.diagonal(H, axis1=1, axis2=2)
+    standardized = np.full((n, dim), np.nan)
+    if sigma0 > 0:
+        valid = r > 1e-10
+        standardized[valid] = v[valid] / (sigma0 * np.sqrt(r[valid]))
+    
+    return {
+        'leverage': leverage,
+        'loo_residuals': loo_residuals,
+        'standardized_residuals': standardized
+    }
@@ -0,0 +1,109 @@
+class Ellipsoid:
+    """
+    参考椭球及其派生常数
+    
+    所有与点位无关的常数(偏心率、子午线弧长展开系数、底点纬度展开系数、Krüger级数系数)
+    在构造时一次性计算，投影与坐标转换函数直接读取，不再逐次重算。
+    
+    参数:
+    name: str, 椭球名称
+    a: float, 长半轴(米)
+    f: float, 扁率
+    """
+    
+    def __init__(self, name, a, f):
+        self.name = name
+        self.a = a  # 长半轴
+        self.f = f  # 扁率
+        self.b = a * (1 - f)  # 短半轴
+        self.e2 = 2*f - f*f  # 第一偏心率平方
+        self.e_prime2 = self.e2/(1-self.e2)  # 第二偏心率平方
+        
+        e2 = self.e2
+        
+        # 子午线弧长 X = m0·B - m2·sin2B + m4·sin4B - m6·sin6B + m8·sin8B 的系数
+        k = a * (1 - e2)
+        self.meridian_coeffs = (
+            k * (1 + 3*e2/4 + 45*e2**2/64 + 175*e2**3/256 + 11025*e2**4/16384),
+            k * (3*e2/8 + 15*e2**2/32 + 525*e2**3/1024 + 2205*e2**4/4096),
+            k * (15*e2**2/256 + 105*e2**3/1024 + 2205*e2**4/16384),
+            k * (35*e2**3/3072 + 315*e2**4/12288),
+            k * (315*e2**4/131072),
+        )
+        
+        # 底点纬度 Bf = mu + f2·sin2mu + f4·sin4mu + f6·sin6mu 的系数，mu = x / mu_divisor
+        self.mu_divisor = a * (1 - e2/4 - 3*e2**2/64 - 5*e2**3/256)
+        self.footpoint_coeffs = (
+            3*e2/8 + 3*e2**2/32 + 45*e2**3/1024,
+            15*e2**2/256 + 45*e2**3/1024,
+            35*e2**3/3072,
+        )
+    
+        # Krüger n级数(展开至n^6)所需常数，供 kruger 投影引擎使用
+        n = f / (2 - f)  # 第三扁率
+        self.n = n
+        self.rectifying_radius = a / (1 + n) * (1 + n**2/4 + n**4/64 + n**6/256)
+        # 大地纬度→等角纬度 chi = B + sum(c_j·sin2jB)
+        self.conformal_coeffs = (
+            -2*n + 2*n**2/3 + 4*n**3/3 - 82*n**4/45 + 32*n**5/45 + 4642*n**6/4725,
+            5*n**2/3 - 16*n**3/15 - 13*n**4/9 + 904*n**5/315 - 1522*n**6/945,
+            -26*n**3/15 + 34*n**4/21 + 8*n**5/5 - 12686*n**6/2835,
+            1237*n**4/630 - 12*n**5/5 - 24832*n**6/14175,
+            -734*n**5/315 + 109598*n**6/31185,
+            444337*n**6/155925,
+        )
+        # 等角纬度→大地纬度 B = chi + sum(d_j·sin2jchi)
+        self.geodetic_coeffs = (
+            2*n - 2*n**2/3 - 2*n**3 + 116*n**4/45 + 26*n**5/45 - 2854*n**6/675,
+            7*n**2/3 - 8*n**3/5 - 227*n**4/45 + 2704*n**5/315 + 2323*n**6/945,
+            56*n**3/15 - 136*n**4/35 - 1262*n**5/105 + 73814*n**6/2835,
+            4279*n**4/630 - 332*n**5/35 - 399572*n**6/14175,
+            4174*n**5/315 - 144838*n**6/6237,
+            601676*n**6/22275,
+        )
+        # 正算系数 alpha_j
+        self.kruger_alpha = (
+            n/2 - 2*n**2/3 + 5*n**3/16 + 41*n**4/180 - 127*n**5/288 + 7891*n**6/37800,
+            13*n**2/48 - 3*n**3/5 + 557*n**4/1440 + 281*n**5/630 - 1983433*n**6/1935360,
+            61*n**3/240 - 103*n**4/140 + 15061*n**5/26880 + 167603*n**6/181440,
+            49561*n**4/161280 - 179*n**5/168 + 6601661*n**6/7257600,
+            34729*n**5/80640 - 3418889*n**6/1995840,
+            212378941*n**6/319334400,
+        )
+        # 反算系数 beta_j
+        self.kruger_beta = (
+            n/2 - 2*n**2/3 + 37*n**3/96 - n**4/360 - 81*n**5/512 + 96199*n**6/604800,
+            n**2/48 + n**3/15 - 437*n**4/1440 + 46*n**5/105 - 1118711*n**6/3870720,
+            17*n**3/480 - 37*n**4/840 - 209*n**5/4480 + 5569*n**6/90720,
+            4397*n**4/161280 - 11*n**5/504 - 830251*n**6/7257600,
+            4583*n**5/161280 - 108847*n**6/3991680,
+            20648693*n**6/638668800,
+        )
+    
+    def __repr__(self):
+        return f"Ellipsoid(name={self.name!r}, a={self.a!r}, f={self.f!r})"
+
+# 椭球注册表
+ELLIPSOIDS = {
+    'WGS84': Ellipsoid('WGS84', 6378137.0, 1/298.257223563),
+    'Beijing54': Ellipsoid('Beijing54', 6378245.0, 1/298.3),
+    'Xian80': Ellipsoid('Xian80', 6378140.0, 1/298.257),
+    'CGCS2000': Ellipsoid('CGCS2000', 6378137.0, 1/298.257222101),
+}
+
+def get_ellipsoid(ellipsoid):
+    """
+    获取椭球对象
+    
+    参数:
+    ellipsoid: str 或 Ellipsoid, 椭球名称(见 ELLIPSOIDS)或椭球对象
+    
+    返回:
+    Ellipsoid: 椭球对象
+    """
+    if isinstance(ellipsoid, Ellipsoid):
+        return ellipsoid
+    try:
+        return ELLIPSOIDS[ellipsoid]
+    except KeyError:
+        raise ValueError(f"未知的椭球: {ellipsoid}，可选 {list(ELLIPSOIDS)}") from None
@@ -1,9 +1,12 @@
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Union, Sequence
+from .diagnostics import point_diagnostics
 
 def calculate_four_parameters(
     source_points: List[Tuple[float, float]], 
-    target_points: List[Tuple[float, float]]
+    target_points: List[Tuple[float, float]],
+    method: str = 'lstsq',
+    diagnostics: bool = False
 ) -> Dict[str, float]:
     """
     计算二维坐标系统之间的四参数转换参数。
@@ -11,6 +14,10 @@ def calculate_four_parameters(
     参数:
         source_points: 源坐标系中的坐标点列表，每个元素为 (x, y) 坐标元组
         target_points: 目标坐标系中的对应坐标点列表，每个元素为 (X, Y) 坐标元组
+        method: 解算方法
+            - 'lstsq': 构建 2n×4 误差方程，用 np.linalg.lstsq 求解(默认)
+            - 'centroid': 基于重心与叉积/点积和的闭合解，单遍 O(n)，结果与 'lstsq' 一致
+        diagnostics: 是否计算逐点粗差诊断量('leverage' 等三项)，需构建完整误差方程并逐点分解，默认不计算
         
     返回:
         包含四个参数的字典:
@@ -20,6 +27,13 @@ def calculate_four_parameters(
             - 'dy': Y方向平移参数
             - 's': 尺度因子
             - 'theta': 旋转角度（弧度）
+            - 'residuals': 残差数组，shape (n,2)，每行为 [X误差, Y误差]
+            - 'rms': 中误差
+            - 'covariance': 参数 (a, b, dx, dy) 的协方差矩阵 σ0²·N⁻¹，shape (4,4)
+            - 'leverage': 各点的杠杆值，shape (n,)
+            - 'loo_residuals': 留一残差，即去掉该点重新解算时该点的残差，shape (n,2)
+            - 'standardized_residuals': Baarda标准化残差(w检验统计量)，shape (n,2)
+            以上三项诊断量仅在 diagnostics=True 时返回，含义见 diagnostics.point_diagnostics
     
     注意:
         至少需要两个控制点才能计算四参数
@@ -32,48 +46,406 @@ def calculate_four_parameters(
         raise ValueError("源坐标点和目标坐标点数量必须相等")
     
     # 构建最小二乘方程组
-    n = len(source_points)
-    A = np.zeros((2*n, 4))
-    L = np.zeros(2*n)
+    source = np.asarray(source_points, dtype=np.float64)
+    target = np.asarray(target_points, dtype=np.float64)
+    if source.ndim != 2 or source.shape[1] != 2 or target.shape != source.shape:
+        raise ValueError("输入坐标格式不正确，每个点应为 (x, y) 坐标")
     
-    for i in range(n):
-        x, y = source_points[i]
-        X, Y = target_points[i]
+    if method == 'centroid':
+        a, b, dx, dy = _centroid_solution(source, target)
+    elif method == 'lstsq':
+        A = _design_matrix(source)
+        L = target.reshape(-1)
         
-        # 构建A矩阵
-        A[2*i, 0] = x
-        A[2*i, 1] = -y
-        A[2*i, 2] = 1
-        A[2*i, 3] = 0
+        # 解最小二乘方程组: A * X = L
+        X, residuals, rank, s = np.linalg.lstsq(A, L, rcond=None)
         
-        A[2*i+1, 0] = y
-        A[2*i+1, 1] = x
-        A[2*i+1, 2] = 0
-        A[2*i+1, 3] = 1
-        
-        # 构建L矩阵
-        L[2*i] = X
-        L[2*i+1] = Y
-    
-    # 解最小二乘方程组: A * X = L
-    X, residuals, rank, s = np.linalg.lstsq(A, L, rcond=None)
-    
-    # 提取参数
-    a, b, dx, dy = X
+        # 提取参数
+        a, b, dx, dy = X
+    else:
+        raise ValueError(f"不支持的四参数解算方法: {method}，可选 'lstsq' 或 'centroid'")
     
     # 计算尺度因子和旋转角度
     scale = np.sqrt(a**2 + b**2)
     theta = np.arctan2(b, a)
     
-    return {
+    # 计算残差及中误差
+    n = source.shape[0]
+    residuals = transform_points_four_par(source, (a, b, dx, dy)) - target
+    v_v = np.sum(residuals**2)
+    rms = np.sqrt(v_v / (2*n - 4)) if n > 2 else 0.0
+    
+    # 精度评估：重心化后法方程为对角阵 diag(Σ(x²+y²), Σ(x²+y²), n, n)，其逆阵直接取倒数
+    center = source.mean(axis=0)
+    reduced = source - center
+    spread = np.sum(reduced**2)
+    Q = np.diag([1 / spread, 1 / spread, 1 / n, 1 / n])
+    
+    result = {
         'a': a,
         'b': b,
         'dx': dx,
         'dy': dy,
         's': scale,
-        'theta': theta
+        'theta': theta,
+        'residuals': residuals,
+        'rms': rms,
+        'covariance': _restore_covariance(Q, center, rms)
+    }
+    if diagnostics:
+        result.update(point_diagnostics(_design_matrix(reduced), Q, residuals.reshape(-1), rms, 2))
+    return result
+
+def _centroid_solution(source, target):
+    """
+    四参数闭合解: 以重心化坐标的点积和与叉积和直接求 a、b，再由重心求平移。
+    
+    所有求和在一次遍历中完成；坐标先减去首点以避免大数相减造成的精度损失。
+    """
+    origin_s = source[0]
+    origin_t = target[0]
+    x = source[:, 0] - origin_s[0]
+    y = source[:, 1] - origin_s[1]
+    X = target[:, 0] - origin_t[0]
+    Y = target[:, 1] - origin_t[1]
+    n = source.shape[0]
+    
+    # 一次遍历得到全部求和项
+    sx, sy, sX, sY = x.sum(), y.sum(), X.sum(), Y.sum()
+    s_dot = np.dot(x, X) + np.dot(y, Y)
+    s_cross = np.dot(x, Y) - np.dot(y, X)
+    s_norm = np.dot(x, x) + np.dot(y, y)
+    
+    # 重心化后的求和
+    denom = s_norm - (sx**2 + sy**2) / n
+    if denom <= 0:
+        raise ValueError("控制点重合，无法计算四参数")
+    a = (s_dot - (sx*sX + sy*sY) / n) / denom
+    b = (s_cross - (sx*sY - sy*sX) / n) / denom
+    
+    # 由重心求平移，并还原首点偏移
+    cx = sx / n + origin_s[0]
+    cy = sy / n + origin_s[1]
+    dx = sX / n + origin_t[0] - (a*cx - b*cy)
+    dy = sY / n + origin_t[1] - (b*cx + a*cy)
+    
+    return a, b, dx, dy
+
+def calculate_four_parameters_grouped(
+    source_points: Union[np.ndarray, List[Tuple[float, float]]],
+    target_points: Union[np.ndarray, List[Tuple[float, float]]],
+    groups: Sequence
+) -> Dict[str, np.ndarray]:
+    """
+    按组批量计算多套互相独立的四参数。
+    
+    各组控制点个数可以不同。所有点的法方程贡献一次算出后按组求和，
+    得到 (k,4,4) 的法方程组，由一次堆叠的 np.linalg.solve 同时解算全部组。
+    
+    参数:
+        source_points: 全部组的源坐标，shape (n,2)
+        target_points: 全部组的目标坐标，shape (n,2)
+        groups: 各点所属组的标签(整数或字符串)，shape (n,)，同组的点不必相邻
+        
+    返回:
+        包含以下键值的字典，除 'residuals' 外均按组排列，与 'groups' 一一对应:
+            - 'groups': 排序后的组标签，shape (k,)
+            - 'a', 'b', 'dx', 'dy', 's', 'theta': 各组四参数，shape (k,)
+            - 'rms': 各组中误差，只有2个控制点的组为0，shape (k,)
+            - 'n_points': 各组控制点个数，shape (k,)
+            - 'residuals': 各点在其所属组参数下的残差，按输入顺序排列，shape (n,2)
+    """
+    source = np.asarray(source_points, dtype=np.float64)
+    target = np.asarray(target_points, dtype=np.float64)
+    if source.ndim != 2 or source.shape[1] != 2 or target.shape != source.shape:
+        raise ValueError("输入坐标格式不正确，每个点应为 (x, y) 坐标")
+    
+    groups = np.asarray(groups)
+    if groups.shape != (source.shape[0],):
+        raise ValueError("组标签个数必须与点数相同")
+    labels, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    if np.any(counts < 2):
+        raise ValueError(f"每组至少需要两个控制点来计算四参数转换，不足的组: {labels[counts < 2].tolist()}")
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    
+    # 按组排序，源、目标坐标各自减去组重心
+    source = source[order]
+    target = target[order]
+    center_s = np.add.reduceat(source, starts, axis=0) / counts[:, np.newaxis]
+    center_t = np.add.reduceat(target, starts, axis=0) / counts[:, np.newaxis]
+    A = _design_matrix(source - np.repeat(center_s, counts, axis=0)).reshape(-1, 2, 4)
+    L = target - np.repeat(center_t, counts, axis=0)
+    
+    # 逐点法方程贡献按组求和，堆叠解算
+    N = np.add.reduceat(np.einsum('nki,nkj->nij', A, A), starts, axis=0)
+    W = np.add.reduceat(np.einsum('nki,nk->ni', A, L), starts, axis=0)
+    a, b, dx, dy = np.linalg.solve(N, W[..., np.newaxis])[..., 0].T
+    
+    # 残差与各组中误差
+    V = np.einsum('nki,ni->nk', A, np.repeat(np.column_stack((a, b, dx, dy)), counts, axis=0)) - L
+    v_v = np.add.reduceat(np.sum(V**2, axis=1), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rms = np.where(counts > 2, np.sqrt(v_v / (2*counts - 4)), 0.0)
+    residuals = np.empty_like(V)
+    residuals[order] = V
+    
+    # 还原重心偏移: d = d' + c_t - M·c_s
+    dx = dx + center_t[:, 0] - (a*center_s[:, 0] - b*center_s[:, 1])
+    dy = dy + center_t[:, 1] - (b*center_s[:, 0] + a*center_s[:, 1])
+    
+    return {
+        'groups': labels,
+        'a': a,
+        'b': b,
+        'dx': dx,
+        'dy': dy,
+        's': np.sqrt(a**2 + b**2),
+        'theta': np.arctan2(b, a),
+        'rms': rms,
+        'n_points': counts,
+        'residuals': residuals
     }
 
+class IncrementalFourParameters:
+    """
+    可逐点增删控制点的四参数增量解算器。
+    
+    保存 4×4 法方程矩阵 N 与右端向量 W，启用/停用一个控制点只需加上/减去该点的
+    秩2贡献，与点数无关；之后调用 solve() 即可得到新的参数与残差。
+    源、目标坐标在内部各自减去首个点的坐标，避免大坐标值使法方程病态。
+    
+    参数:
+        source_points: 初始的源坐标点，shape (n,2)，可选
+        target_points: 初始的目标坐标点，shape (n,2)，可选
+        active: 初始点是否参与解算，bool 或 bool 数组
+    """
+    
+    def __init__(
+        self,
+        source_points: Union[np.ndarray, List[Tuple[float, float]], None] = None,
+        target_points: Union[np.ndarray, List[Tuple[float, float]], None] = None,
+        active: Union[bool, Sequence[bool]] = True
+    ):
+        self._source = np.empty((0, 2))
+        self._target = np.empty((0, 2))
+        self._active = np.empty(0, dtype=bool)
+        self._size = 0
+        self._origin_s = None
+        self._origin_t = None
+        self._N = np.zeros((4, 4))
+        self._W = np.zeros(4)
+        if source_points is not None:
+            self.add_points(source_points, target_points, active)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def active(self) -> np.ndarray:
+        """各点是否参与解算，bool 数组(副本)"""
+        return self._active[:self._size].copy()
+    
+    @property
+    def n_active(self) -> int:
+        """参与解算的控制点个数"""
+        return int(np.count_nonzero(self._active[:self._size]))
+    
+    def add_point(self, source: Tuple[float, float], target: Tuple[float, float], active: bool = True) -> int:
+        """
+        增加一个控制点，返回该点的编号，供 enable/disable 使用。
+        """
+        return int(self.add_points([source], [target], active)[0])
+    
+    def add_points(self, source_points, target_points, active: Union[bool, Sequence[bool]] = True) -> np.ndarray:
+        """
+        批量增加控制点，返回新增各点的编号。
+        """
+        source = np.array(source_points, dtype=np.float64)
+        target = np.array(target_points, dtype=np.float64)
+        if source.ndim != 2 or source.shape[1] != 2 or target.shape != source.shape:
+            raise ValueError("输入坐标格式不正确，每个点应为 (x, y) 坐标")
+        active = np.broadcast_to(np.asarray(active, dtype=bool), source.shape[:1])
+        
+        k = source.shape[0]
+        if k == 0:
+            return np.arange(self._size, self._size)
+        if self._origin_s is None:
+            self._origin_s = source[0].copy()
+            self._origin_t = target[0].copy()
+        
+        # 容量不足时按倍数扩充，均摊后每点O(1)
+        start = self._size
+        if start + k > self._source.shape[0]:
+            capacity = max(2 * self._source.shape[0], start + k, 16)
+            self._source = np.resize(self._source, (capacity, 2))
+            self._target = np.resize(self._target, (capacity, 2))
+            self._active = np.resize(self._active, capacity)
+        self._source[start:start + k] = source - self._origin_s
+        self._target[start:start + k] = target - self._origin_t
+        self._active[start:start + k] = False
+        self._size += k
+        
+        indices = np.arange(start, start + k)
+        self._update(indices[active], 1)
+        return indices
+    
+    def enable(self, index: int) -> None:
+        """启用编号为 index 的控制点，O(1)"""
+        self.set_active(index, True)
+    
+    def disable(self, index: int) -> None:
+        """停用编号为 index 的控制点，O(1)"""
+        self.set_active(index, False)
+    
+    def set_active(self, index: int, active: bool) -> None:
+        """设置编号为 index 的控制点是否参与解算，状态不变时不做任何计算"""
+        index = int(index)
+        if not 0 <= index < self._size:
+            raise IndexError(f"控制点编号超出范围: {index}")
+        if self._active[index] != bool(active):
+            self._update([index], 1 if active else -1)
+    
+    def rebuild(self) -> None:
+        """由当前启用的点重新累加法方程，消除多次增删积累的舍入误差"""
+        self._N[:] = 0
+        self._W[:] = 0
+        indices = np.flatnonzero(self._active[:self._size])
+        self._active[indices] = False
+        self._update(indices, 1)
+    
+    def solve(self, diagnostics: bool = False) -> Dict[str, float]:
+        """
+        由当前法方程解算四参数。
+        
+        参数:
+            diagnostics: 是否计算逐点粗差诊断量，见 calculate_four_parameters
+        
+        返回:
+            与 calculate_four_parameters 相同的字典('residuals' 及诊断量仅含启用的点，按编号排列)，另含:
+                - 'all_residuals': 全部已加入点(含停用点)在当前参数下的残差，shape (n,2)
+        """
+        n = self.n_active
+        if n < 2:
+            raise ValueError("至少需要两个控制点来计算四参数转换")
+        
+        # 一次分解同时得到参数与法方程逆阵，逆阵供诊断使用
+        solution = np.linalg.solve(self._N, np.column_stack((self._W, np.eye(4))))
+        a, b, dx, dy = solution[:, 0]
+        
+        source = self._source[:self._size]
+        target = self._target[:self._size]
+        all_residuals = transform_points_four_par(source, (a, b, dx, dy)) - target
+        active = self._active[:self._size]
+        residuals = all_residuals[active]
+        v_v = np.sum(residuals**2)
+        rms = np.sqrt(v_v / (2*n - 4)) if n > 2 else 0.0
+        
+        # 还原首点偏移: d = d' + c_t - M·c_s
+        cx, cy = self._origin_s
+        dx += self._origin_t[0] - (a*cx - b*cy)
+        dy += self._origin_t[1] - (b*cx + a*cy)
+        
+        result = {
+            'a': a,
+            'b': b,
+            'dx': dx,
+            'dy': dy,
+            's': np.sqrt(a**2 + b**2),
+            'theta': np.arctan2(b, a),
+            'residuals': residuals,
+            'rms': rms,
+            'covariance': _restore_covariance(solution[:, 1:], self._origin_s, rms),
+            'all_residuals': all_residuals
+        }
+        if diagnostics:
+            result.update(point_diagnostics(_design_matrix(source[active]), solution[:, 1:],
+                                            residuals.reshape(-1), rms, 2))
+        return result
+    
+    def _update(self, indices, sign: int) -> None:
+        """将 indices 各点的法方程贡献乘以 sign 后累加，并更新启用状态"""
+        indices = np.asarray(indices, dtype=np.intp)
+        if indices.size == 0:
+            return
+        A = _design_matrix(self._source[indices])
+        L = self._target[indices].reshape(-1)
+        self._N += sign * (A.T @ A)
+        self._W += sign * (A.T @ L)
+        self._active[indices] = sign > 0
+
+def _restore_covariance(Q: np.ndarray, origin: np.ndarray, sigma0: float) -> np.ndarray:
+    """
+    由源坐标减去 origin 后的法方程逆阵 Q 得到原坐标下 (a, b, dx, dy) 的协方差矩阵。
+    
+    dx = dx' - a·x0 + b·y0，dy = dy' - b·x0 - a·y0，按此线性关系传播 Σ = σ0²·J·Q·Jᵀ。
+    """
+    x0, y0 = origin
+    J = np.array([
+        [1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [-x0, y0, 1, 0],
+        [-y0, -x0, 0, 1]
+    ])
+    return sigma0**2 * (J @ Q @ J.T)
+
+def propagate_four_par_covariance(
+    points: Union[np.ndarray, List[Tuple[float, float]]],
+    params: Union[Dict[str, float], Sequence[float]],
+    covariance: np.ndarray,
+    point_covariance: Union[np.ndarray, None] = None,
+    chunk_size: int = 65536,
+    out: Union[np.ndarray, None] = None
+) -> np.ndarray:
+    """
+    将四参数的协方差(及可选的源坐标协方差)传播到转换后的坐标。
+    
+    转换坐标的协方差为 Σ' = A·Σp·Aᵀ + M·Σx·Mᵀ，其中 A = [[x, -y, 1, 0], [y, x, 0, 1]]
+    为对参数的雅可比矩阵，M = [[a, -b], [b, a]] 为对源坐标的雅可比矩阵；
+    各点的雅可比矩阵按块向量化构建，内存占用只与 chunk_size 有关。
+    
+    参数:
+        points: 源坐标，shape (n,2)
+        params: 四参数字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+        covariance: 参数 (a, b, dx, dy) 的协方差矩阵，shape (4,4)，
+            如 calculate_four_parameters 返回的 'covariance'
+        point_covariance: 源坐标的协方差矩阵，shape (2,2) 所有点共用或 (n,2,2) 逐点给出；
+            为 None 时视源坐标无误差
+        chunk_size: 每块处理的点数
+        out: 可选的预分配输出数组，shape (n,2,2)，结果直接写入其中
+        
+    返回:
+        转换后各点的协方差矩阵，shape (n,2,2)，对角线开方即为各方向中误差
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("输入坐标数组格式不正确，应为(n,2)的数组")
+    covariance = np.asarray(covariance, dtype=np.float64)
+    if covariance.shape != (4, 4):
+        raise ValueError("参数协方差矩阵应为(4,4)的数组")
+    n = points.shape[0]
+    if out is None:
+        out = np.empty((n, 2, 2))
+    
+    # 源坐标误差的贡献 M·Σx·Mᵀ
+    if point_covariance is not None:
+        point_covariance = np.asarray(point_covariance, dtype=np.float64)
+        if point_covariance.shape not in ((2, 2), (n, 2, 2)):
+            raise ValueError("源坐标协方差应为(2,2)或(n,2,2)的数组")
+        a, b, _, _ = _unpack_four_params(params)
+        M = np.array([[a, -b], [b, a]])
+        np.matmul(M @ point_covariance, M.T, out=out)
+    else:
+        out[...] = 0
+    
+    # 参数误差的贡献 A·Σp·Aᵀ
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        A = _design_matrix(points[start:stop]).reshape(-1, 2, 4)
+        out[start:stop] += np.einsum('nik,kl,njl->nij', A, covariance, A)
+    
+    return out
+
 def transform_coordinates(
     points: List[Tuple[float, float]], 
     params: Dict[str, float]
@@ -88,20 +460,151 @@ def transform_coordinates(
     返回:
         转换后的坐标点列表，每个元素为 (X, Y) 坐标元组
     """
-    a = params['a']
-    b = params['b']
-    dx = params['dx']
-    dy = params['dy']
+    if len(points) == 0:
+        return []
+    
+    transformed = transform_points_four_par(np.asarray(points, dtype=np.float64), params)
+    
+    return [tuple(point) for point in transformed.tolist()]
+
+def invert_four_parameters(params: Union[Dict[str, float], Sequence[float]]) -> Dict[str, float]:
+    """
+    求四参数的逆变换参数。
+    
+    把 (a, b) 看作复数 z = a + i·b，正变换为 Z = z·w + d，逆变换即 w = z⁻¹·Z - z⁻¹·d，结果严密。
+    
+    参数:
+        params: 四参数字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+        
+    返回:
+        逆变换的四参数字典，含 'a', 'b', 'dx', 'dy', 's', 'theta'
+    """
+    a, b, dx, dy = _unpack_four_params(params)
+    z = complex(a, b)
+    if z == 0:
+        raise ValueError("四参数尺度为0，不可逆")
+    z_inv = 1 / z
+    return _four_params_dict(z_inv, -z_inv * complex(dx, dy))
+
+def compose_four_parameters(*param_sets: Union[Dict[str, float], Sequence[float]]) -> Dict[str, float]:
+    """
+    将依次执行的多组四参数合并为一组，之后只需一次 transform_points_four_par。
     
-    transformed_points = []
-    for x, y in points:
-        X = a * x - b * y + dx
-        Y = b * x + a * y + dy
-        transformed_points.append((X, Y))
+    相似变换对复合封闭，Z = z₂·(z₁·w + d₁) + d₂ = (z₂·z₁)·w + (z₂·d₁ + d₂)，结果严密。
     
-    return transformed_points
+    参数:
+        *param_sets: 按执行顺序排列的各组四参数(第一组最先作用于源坐标)，
+            每组为字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+        
+    返回:
+        合并后的四参数字典，含 'a', 'b', 'dx', 'dy', 's', 'theta'
+    """
+    if not param_sets:
+        raise ValueError("至少需要一组四参数")
+    z, d = complex(1, 0), complex(0, 0)
+    for params in param_sets:
+        a, b, dx, dy = _unpack_four_params(params)
+        z_next = complex(a, b)
+        z, d = z_next * z, z_next * d + complex(dx, dy)
+    return _four_params_dict(z, d)
 
-def transform_point_four_par(point, params):
+def _four_params_dict(z: complex, d: complex) -> Dict[str, float]:
+    """由复数形式的旋转缩放 z 与平移 d 构造四参数字典"""
+    return {
+        'a': z.real,
+        'b': z.imag,
+        'dx': d.real,
+        'dy': d.imag,
+        's': abs(z),
+        'theta': np.arctan2(z.imag, z.real)
+    }
+
+def transform_points_four_par(
+    points: Union[np.ndarray, Tuple[np.ndarray, np.ndarray]],
+    params: Union[Dict[str, float], Sequence[float]],
+    out=None,
+    fields: Tuple[str, str] = ('x', 'y')
+):
+    """
+    使用四参数模型批量转换平面坐标。
+    
+    参数:
+        points: 源坐标系中的点，支持三种形式:
+            - shape (n,2) 的数组，每行为 (x, y)
+            - (x, y) 两列数组组成的元组
+            - 含 fields 所列字段的结构化数组
+        params: 四参数字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+        out: 可选的预分配输出，形式与 points 相同，结果直接写入其中
+        fields: 结构化数组中 x、y 坐标的字段名
+        
+    返回:
+        转换后的坐标，形式与 points 相同；结构化数组输入时返回同 dtype 的结构化数组，
+        其余字段原样保留
+    """
+    a, b, dx, dy = _unpack_four_params(params)
+    
+    # 分列输入
+    if isinstance(points, tuple):
+        if len(points) != 2:
+            raise ValueError("分列输入应为 (x, y) 两个数组组成的元组")
+        x, y = (np.asarray(c, dtype=np.float64) for c in points)
+        if out is None:
+            shape = np.broadcast(x, y).shape
+            out = (np.empty(shape), np.empty(shape))
+        X, Y = transform_point_four_par((x, y), (a, b, dx, dy), out=out)
+        return (X[()], Y[()])
+    
+    # 结构化数组输入：按字段转换
+    if getattr(points, 'dtype', None) is not None and points.dtype.names:
+        x_field, y_field = fields
+        if out is None:
+            out = points.copy()
+        elif out is not points:
+            out[...] = points
+        x = np.array(points[x_field], dtype=np.float64)
+        y = np.array(points[y_field], dtype=np.float64)
+        out[x_field] = a * x - b * y + dx
+        out[y_field] = b * x + a * y + dy
+        return out
+    
+    # (n,2)数组输入：一次矩阵乘法完成旋转与缩放
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 0 or points.shape[-1] != 2:
+        raise ValueError("输入坐标数组格式不正确，应为(n,2)的数组")
+    M = np.array([
+        [a, b],
+        [-b, a]
+    ])
+    transformed = np.matmul(points, M, out=out)
+    transformed += (dx, dy)
+    
+    return transformed
+
+def _design_matrix(source):
+    """
+    构建四参数误差方程的系数矩阵，第i个点对应第2i、2i+1行:
+        [x, -y, 1, 0]
+        [y,  x, 0, 1]
+    """
+    x = source[:, 0]
+    y = source[:, 1]
+    A = np.zeros((source.shape[0], 2, 4))
+    A[:, 0, 0] = x
+    A[:, 0, 1] = -y
+    A[:, 0, 2] = 1
+    A[:, 1, 0] = y
+    A[:, 1, 1] = x
+    A[:, 1, 3] = 1
+    return A.reshape(-1, 4)
+
+def _unpack_four_params(params):
+    """将四参数字典或序列拆分为 (a, b, dx, dy)"""
+    if isinstance(params, dict):
+        return params['a'], params['b'], params['dx'], params['dy']
+    a, b, dx, dy = params
+    return a, b, dx, dy
+
+def transform_point_four_par(point, params, out=None):
     """
     使用四参数模型转换单点坐标
     
@@ -111,19 +614,15 @@ def transform_point_four_par(point, params):
     params: Dict[str, float] 或包含四个元素的序列
         四参数 {'a': float, 'b': float, 'dx': float, 'dy': float} 或
         [a, b, dx, dy]
+    out: Tuple[numpy.ndarray, numpy.ndarray], 可选
+        预分配的输出数组 (X, Y)，point的分量为数组时结果直接写入其中
         
     返回:
     Tuple[float, float]
         目标坐标系中的点坐标 (X, Y)
     """
     # 处理参数输入
-    if isinstance(params, dict):
-        a = params['a']
-        b = params['b']
-        dx = params['dx']
-        dy = params['dy']
-    else:
-        a, b, dx, dy = params
+    a, b, dx, dy = _unpack_four_params(params)
         
     # 获取输入点坐标
     if hasattr(point, '__len__') and len(point) == 2:
@@ -132,6 +631,20 @@ def transform_point_four_par(point, params):
         raise ValueError("输入点坐标应为包含2个元素的序列 (x, y)")
     
     # 应用四参数转换
+    if out is not None:
+        X, Y = out
+        if any(np.may_share_memory(o, c) for o in out for c in (x, y)):
+            # 原地转换时输出覆盖输入，先算到临时数组再写入
+            X[...], Y[...] = transform_point_four_par((x, y), (a, b, dx, dy))
+            return (X, Y)
+        np.multiply(a, x, out=X)
+        X -= b * y
+        X += dx
+        np.multiply(b, x, out=Y)
+        Y += a * y
+        Y += dy
+        return (X, Y)
+    
     X = a * x - b * y + dx
     Y = b * x + a * y + dy
     
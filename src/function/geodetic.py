@@ -0,0 +1,495 @@
+import numpy as np
+from .ellipsoid import get_ellipsoid
+from .kruger import kruger_BLH2xy, kruger_xy2BLH
+
+# 高斯投影计算引擎
+PROJECTION_ENGINES = (
+    'gauss',   # 经典高斯投影幂级数公式（默认）
+    'kruger',  # Krüger n级数 + Clenshaw求和，全带范围亚毫米精度
+)
+
+# XYZ→BLH可选算法（对 |H| ≤ 10 km、全纬度范围实测的纬度最大误差）
+XYZ2BLH_ALGORITHMS = (
+    'iterative',  # 不动点迭代（默认），逐点收敛至 1e-12 rad
+    'bowring',    # Bowring(1976)单步公式，纬度误差 < 2e-13 rad(约1 µm)，高程误差 < 1e-8 m
+    'vermeille',  # Vermeille(2002)闭合解，纬度误差 < 1e-15 rad(双精度舍入级)
+    'newton',     # 两步牛顿迭代，纬度误差 < 1e-15 rad(双精度舍入级)
+)
+
+# Molodensky公式适用的最大纬度，超出时改用严密往返计算
+MOLODENSKY_MAX_LATITUDE = np.radians(85.0)
+
+def BLH2XYZ(B, L, H, ellipsoid, out=None):
+    """
+    任意椭球下BLH到XYZ的转换
+    
+    参数:
+    B: float 或 numpy.ndarray, 大地纬度(弧度)
+    L: float 或 numpy.ndarray, 大地经度(弧度)
+    H: float 或 numpy.ndarray, 大地高(米)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    out: tuple, 可选的预分配输出数组 (X, Y, Z)，结果直接写入其中
+    
+    返回:
+    tuple: (X, Y, Z) 地心地固直角坐标
+    """
+    ell = get_ellipsoid(ellipsoid)
+    a, e2 = ell.a, ell.e2
+    
+    if out is not None:
+        X, Y, Z = _check_out(out, 3)
+        if _overlaps(out, (B, L, H)):
+            # 原地转换时输出覆盖输入，先算到临时数组再写入
+            X[...], Y[...], Z[...] = BLH2XYZ(B, L, H, ell)
+        else:
+            blh2xyz_into(B, L, H, ell, X, Y, Z, np.empty_like(X))
+        return X, Y, Z
+    
+    sin_B = np.sin(B)
+    cos_B = np.cos(B)
+    
+    # 计算卯酉圈曲率半径N
+    N = a / np.sqrt(1 - e2 * sin_B**2)
+    
+    # 计算X、Y、Z
+    X = (N + H) * cos_B * np.cos(L)
+    Y = (N + H) * cos_B * np.sin(L)
+    Z = (N * (1 - e2) + H) * sin_B
+    
+    return X, Y, Z
+
+def XYZ2BLH(X, Y, Z, ellipsoid, algorithm='iterative', eps=1e-12, out=None):
+    """
+    任意椭球下XYZ到BLH的转换
+    
+    参数:
+    X: float 或 numpy.ndarray, 地心地固直角坐标X(米)
+    Y: float 或 numpy.ndarray, 地心地固直角坐标Y(米)
+    Z: float 或 numpy.ndarray, 地心地固直角坐标Z(米)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    algorithm: str, 纬度解算算法，可选 'iterative'、'bowring'、'vermeille'、'newton'，
+               除 'iterative' 外均为固定运算次数、无数据相关分支的解法
+    eps: float, 'iterative' 算法的迭代精度阈值(弧度)
+    out: tuple, 可选的预分配输出数组 (B, L, H)，结果直接写入其中
+    
+    返回:
+    tuple: (B, L, H) 大地纬度(弧度)、大地经度(弧度)、大地高(米)，
+           输入为数组时返回同形状的数组
+    """
+    if algorithm not in XYZ2BLH_ALGORITHMS:
+        raise ValueError(f"不支持的XYZ转BLH算法: {algorithm}，可选 {XYZ2BLH_ALGORITHMS}")
+    
+    ell = get_ellipsoid(ellipsoid)
+    a, f, e2 = ell.a, ell.f, ell.e2
+    B_out, L_out, H_out = _check_out(out, 3)
+    
+    # 统一转换为浮点数组，支持标量与任意形状的数组输入
+    X = np.asarray(X, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    Z = np.asarray(Z, dtype=np.float64)
+    
+    if out is not None and _overlaps(out, (X, Y, Z)):
+        # 原地转换时输出覆盖输入，先算到临时数组再写入
+        B_out[...], L_out[...], H_out[...] = XYZ2BLH(X, Y, Z, ell, algorithm, eps)
+        return B_out, L_out, H_out
+    
+    # 计算大地经度L
+    L = np.arctan2(Y, X, out=L_out)
+    
+    # 计算辅助参数
+    p = np.hypot(X, Y)
+    
+    if algorithm == 'iterative':
+        B, H = _xyz2bh_iterative(p, Z, a, e2, eps, B_out, H_out)
+    elif algorithm == 'bowring':
+        B, H = _xyz2bh_bowring(p, Z, a, f, e2, B_out, H_out)
+    elif algorithm == 'vermeille':
+        B, H = _xyz2bh_vermeille(p, Z, a, e2, B_out, H_out)
+    else:
+        B, H = _xyz2bh_newton(p, Z, a, e2, B_out, H_out)
+    
+    if out is not None:
+        return B, L, H
+    
+    # 标量输入返回标量，数组输入返回数组
+    return B[()], L[()], H[()]
+
+def _height(p, Z, B, a, e2, H_out=None):
+    """由纬度计算大地高，避免在两极附近除以cos(B)"""
+    sin_B = np.sin(B)
+    cos_B = np.cos(B)
+    return np.subtract(p*cos_B + Z*sin_B, a*np.sqrt(1 - e2*sin_B**2), out=H_out)
+
+def _xyz2bh_iterative(p, Z, a, e2, eps, B_out=None, H_out=None):
+    """不动点迭代，按元素判断收敛，每轮只对尚未收敛的点继续迭代"""
+    # 初始化大地纬度B的计算
+    B = np.arctan2(Z, p*(1-e2), out=B_out)  # 初始值
+    
+    B_flat = np.reshape(B, -1)
+    p_flat = np.broadcast_to(p, B.shape).reshape(-1)
+    Z_flat = np.broadcast_to(Z, B.shape).reshape(-1)
+    active = np.arange(B_flat.size)
+    while active.size:
+        B_old = B_flat[active]
+        sin_B = np.sin(B_old)
+        N = a / np.sqrt(1 - e2*sin_B**2)
+        B_new = np.arctan2(Z_flat[active] + e2*N*sin_B, p_flat[active])
+        B_flat[active] = B_new
+        
+        # 检查收敛条件，剔除已收敛的点
+        active = active[np.abs(B_new - B_old) >= eps]
+    if B_out is None:
+        B = B_flat.reshape(np.shape(B))
+    elif not np.shares_memory(B_flat, B_out):
+        B_out[...] = B_flat.reshape(B_out.shape)
+    
+    # 最终计算大地高H
+    N = a / np.sqrt(1 - e2*np.sin(B)**2)
+    H = np.subtract(p/np.cos(B), N, out=H_out)
+    
+    return B, H
+
+def _xyz2bh_bowring(p, Z, a, f, e2, B_out=None, H_out=None):
+    """Bowring单步公式：由归化纬度的近似值一步得到大地纬度"""
+    b = a * (1 - f)  # 短半轴
+    ep2 = e2 / (1 - e2)  # 第二偏心率平方
+    
+    # 归化纬度初值
+    beta = np.arctan2(a*Z, b*p)
+    sin_beta = np.sin(beta)
+    cos_beta = np.cos(beta)
+    
+    B = np.arctan2(Z + ep2*b*sin_beta**3, p - e2*a*cos_beta**3, out=B_out)
+    H = _height(p, Z, B, a, e2, H_out)
+    
+    return B, H
+
+def _xyz2bh_vermeille(p, Z, a, e2, B_out=None, H_out=None):
+    """Vermeille闭合解，适用于地心附近演化曲面以外的全部点位"""
+    e4 = e2 * e2
+    
+    pp = p**2 / a**2
+    q = (1 - e2) / a**2 * Z**2
+    r = (pp + q - e4) / 6
+    s = e4 * pp * q / (4 * r**3)
+    t = np.cbrt(1 + s + np.sqrt(s * (2 + s)))
+    u = r * (1 + t + 1/t)
+    v = np.sqrt(u**2 + e4*q)
+    w = e2 * (u + v - q) / (2*v)
+    k = np.sqrt(u + v + w**2) - w
+    D = k * p / (k + e2)
+    
+    D_Z = np.sqrt(D**2 + Z**2)
+    B = np.arctan2(Z, D + D_Z, out=B_out)
+    B *= 2
+    H = np.multiply((k + e2 - 1) / k, D_Z, out=H_out)
+    
+    return B, H
+
+def _xyz2bh_newton(p, Z, a, e2, B_out=None, H_out=None):
+    """
+    以 p·sinB - Z·cosB - a·e2·sinB·cosB/W = 0 为纬度方程，
+    自 arctan(Z/(p(1-e2))) 起做固定两步牛顿迭代
+    """
+    B = np.arctan2(Z, p*(1-e2), out=B_out)  # 初始值
+    
+    for _ in range(2):
+        sin_B = np.sin(B)
+        cos_B = np.cos(B)
+        W2 = 1 - e2*sin_B**2
+        W = np.sqrt(W2)
+        F = p*sin_B - Z*cos_B - a*e2*sin_B*cos_B/W
+        dF = p*cos_B + Z*sin_B - a*e2*((cos_B**2 - sin_B**2)/W + e2*sin_B**2*cos_B**2/(W*W2))
+        B -= F/dF
+    
+    H = _height(p, Z, B, a, e2, H_out)
+    
+    return B, H
+
+def molodensky(B, L, H, source_ellipsoid, target_ellipsoid, shift, abridged=False, out=None):
+    """
+    Molodensky基准转换，直接在大地坐标上完成换椭球与平移
+    
+    只考虑三个平移参数，省去 BLH→XYZ→七参数→XYZ→BLH 往返中的迭代反算，
+    适用于旋转、尺度可忽略的场合(如制图级GNSS数据)。对WGS84→北京54、约150米平移、
+    大地高0~5 km，与严密往返计算相比标准公式的点位误差在|B|≤55°(含我国全境)时 < 5 mm，
+    |B|≤80°时 < 15 mm，|B|≤85°时 < 3 cm；dL含1/cosB，误差随|B|→90°无界增大
+    (89.9°时约1 m，89.99°时约10 m)，因此|B|超过 MOLODENSKY_MAX_LATITUDE(85°)的点
+    自动改用 BLH→XYZ→平移→XYZ→BLH 的严密往返计算。简化公式在|B|≤80°时误差约0.15 m。
+    输出经度规化到 (-π, π]。
+    
+    参数:
+    B: float 或 numpy.ndarray, 源椭球大地纬度(弧度)
+    L: float 或 numpy.ndarray, 源椭球大地经度(弧度)
+    H: float 或 numpy.ndarray, 源椭球大地高(米)
+    source_ellipsoid: str 或 Ellipsoid, 源椭球
+    target_ellipsoid: str 或 Ellipsoid, 目标椭球
+    shift: 包含3个元素的序列, 源坐标系原点到目标坐标系的平移 [ΔX, ΔY, ΔZ](米)，
+           与七参数的平移参数含义相同
+    abridged: bool, 是否使用简化Molodensky公式
+    out: tuple, 可选的预分配输出数组 (B, L, H)，结果直接写入其中
+    
+    返回:
+    tuple: (B, L, H) 目标椭球下的大地纬度(弧度)、大地经度(弧度)、大地高(米)
+    """
+    src = get_ellipsoid(source_ellipsoid)
+    dst = get_ellipsoid(target_ellipsoid)
+    dX, dY, dZ = (float(v) for v in shift)
+    a, f, e2 = src.a, src.f, src.e2
+    da = dst.a - src.a
+    df = dst.f - src.f
+    
+    B = np.asarray(B, dtype=np.float64)
+    L = np.asarray(L, dtype=np.float64)
+    H = np.asarray(H, dtype=np.float64)
+    B_out, L_out, H_out = _check_out(out, 3)
+    
+    sin_B = np.sin(B)
+    cos_B = np.cos(B)
+    sin_L = np.sin(L)
+    cos_L = np.cos(L)
+    w2 = 1 - e2 * sin_B**2
+    N = a / np.sqrt(w2)  # 卯酉圈曲率半径
+    M = a * (1 - e2) / (w2 * np.sqrt(w2))  # 子午圈曲率半径
+    
+    # 平移量在当地北、东、天方向的分量
+    north = -dX * sin_B * cos_L - dY * sin_B * sin_L + dZ * cos_B
+    east = -dX * sin_L + dY * cos_L
+    up = dX * cos_B * cos_L + dY * cos_B * sin_L + dZ * sin_B
+    
+    if abridged:
+        k = a * df + f * da
+        dB = (north + k * 2 * sin_B * cos_B) / M
+        dL = east / (N * cos_B)
+        dH = up + k * sin_B**2 - da
+    else:
+        b_a = 1 - f  # b/a
+        dB = (north + da * N * e2 * sin_B * cos_B / a
+              + df * (M / b_a + N * b_a) * sin_B * cos_B) / (M + H)
+        dL = east / ((N + H) * cos_B)
+        dH = up - da * a / N + df * b_a * N * sin_B**2
+    
+    # 极区改用严密往返计算，dL的1/cosB使公式误差无界；在写入out之前取出源坐标，以支持原地转换
+    shape = np.broadcast_shapes(B.shape, L.shape, H.shape)
+    polar = np.broadcast_to(np.abs(B) > MOLODENSKY_MAX_LATITUDE, shape)
+    if np.any(polar):
+        X, Y, Z = BLH2XYZ(*(np.broadcast_to(v, shape)[polar] for v in (B, L, H)), src)
+        exact = XYZ2BLH(X + dX, Y + dY, Z + dZ, dst)
+    
+    B_new = np.asarray(np.add(B, dB, out=B_out))
+    # 经度规化到 (-π, π]，避免跨越±180°时超出范围
+    L_new = np.asarray(np.subtract(np.pi, np.remainder(np.pi - (L + dL), 2*np.pi), out=L_out))
+    H_new = np.asarray(np.add(H, dH, out=H_out))
+    if np.any(polar):
+        B_new[polar], L_new[polar], H_new[polar] = exact
+    
+    if out is not None:
+        return B_new, L_new, H_new
+    return B_new[()], L_new[()], H_new[()]
+
+def BLH2xy(B, L, ellipsoid, central_meridian=None, degree_belt=6, false_easting=500000, false_northing=0,
+           return_zone=False, engine='gauss', out=None):
+    """
+    任意椭球下大地坐标(BLH)转高斯投影平面坐标(x,y)
+    
+    参数:
+    B: float 或 numpy.ndarray, 大地纬度(弧度)
+    L: float 或 numpy.ndarray, 大地经度(弧度)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    central_meridian: float, 中央经线(弧度)，如果为None则根据degree_belt逐点自动分带，
+                      数组输入可跨越多个投影带
+    degree_belt: int, 投影带宽，3度带或6度带
+    false_easting: float, 东偏移(默认500000米)
+    false_northing: float, 北偏移(默认0米)
+    return_zone: bool, 是否同时返回每个点的带号
+    engine: str, 投影计算引擎，'gauss' 或 'kruger'，见 PROJECTION_ENGINES
+    out: tuple, 可选的预分配输出数组 (y, x)，结果直接写入其中
+    
+    返回:
+    tuple: (y, x) 高斯投影坐标，y为东坐标，x为北坐标(米)；
+           return_zone为True时返回 (y, x, zone_number)
+    """
+    _check_engine(engine)
+    ell = get_ellipsoid(ellipsoid)
+    a, e2, e_prime2 = ell.a, ell.e2, ell.e_prime2
+    m0, m2, m4, m6, m8 = ell.meridian_coeffs
+    y_out, x_out = _check_out(out, 2)
+    
+    # 确定中央经线
+    if central_meridian is None:
+        # 逐点确定带号及其中央经线
+        zone_number = _zone_of_longitude(L, degree_belt)
+        central_meridian = _central_meridian_of_zone(zone_number, degree_belt)
+    elif return_zone:
+        zone_number = _zone_of_central_meridian(central_meridian, degree_belt)
+    
+    if engine == 'kruger':
+        y, x = kruger_BLH2xy(B, L, ell, central_meridian, false_easting, false_northing, out=out)
+        if return_zone:
+            return y, x, np.broadcast_to(zone_number, np.shape(x))[()]
+        return y, x
+    
+    # 计算经差l
+    l = L - central_meridian
+    
+    # 计算辅助参数
+    sin_B = np.sin(B)
+    cos_B = np.cos(B)
+    tan_B = np.tan(B)
+    
+    N = a / np.sqrt(1 - e2 * sin_B**2)  # 卯酉圈曲率半径
+    
+    t = tan_B
+    eta2 = e_prime2 * cos_B**2
+    
+    # 计算子午线弧长
+    X = m0 * B - m2 * np.sin(2*B) + m4 * np.sin(4*B) - m6 * np.sin(6*B) + m8 * np.sin(8*B)
+    
+    # 计算高斯投影坐标
+    x = X + N * sin_B * cos_B * l**2 * (1/2 + (5 - t**2 + 9*eta2 + 4*eta2**2)/24 * l**2 + (61 - 58*t**2 + t**4)/720 * l**4)
+    y = N * l * cos_B * (1 + (1 - t**2 + eta2)/6 * l**2 + (5 - 18*t**2 + t**4 + 14*eta2 - 58*eta2*t**2)/120 * l**4)
+    
+    # 添加偏移量
+    y = np.add(y, false_easting, out=y_out)
+    x = np.add(x, false_northing, out=x_out)
+    
+    if return_zone:
+        zone_number = np.broadcast_to(zone_number, np.shape(x))
+        return y, x, zone_number[()]
+    
+    return y, x  # 注意：y为东坐标，x为北坐标
+
+def xy2BLH(x, y, ellipsoid, central_meridian=None, degree_belt=6, false_easting=500000, false_northing=0,
+           zone_number=None, engine='gauss', out=None):
+    """
+    任意椭球下高斯投影平面坐标(x,y)转大地坐标(B,L)
+    
+    参数:
+    x: float 或 numpy.ndarray, 北坐标(米)
+    y: float 或 numpy.ndarray, 东坐标(米)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    central_meridian: float, 中央经线(弧度)，如果为None则根据zone_number或投影带自动计算
+    degree_belt: int, 投影带宽，3度带或6度带
+    false_easting: float, 东偏移(默认500000米)
+    false_northing: float, 北偏移(默认0米)
+    zone_number: int 或 numpy.ndarray, 每个点的带号(如BLH2xy返回的带号)，
+                 仅在central_meridian为None时使用
+    engine: str, 投影计算引擎，'gauss' 或 'kruger'，见 PROJECTION_ENGINES
+    out: tuple, 可选的预分配输出数组 (B, L)，结果直接写入其中
+    
+    返回:
+    tuple: (B, L) 大地纬度(弧度)、大地经度(弧度)
+    """
+    _check_engine(engine)
+    ell = get_ellipsoid(ellipsoid)
+    B_out, L_out = _check_out(out, 2)
+    
+    # 确定中央经线
+    if central_meridian is None:
+        if zone_number is None:
+            # 根据投影带宽计算大致中央经线
+            # 估计带号
+            zone_number = np.floor(np.asarray(y) / false_easting + 0.5).astype(int)
+        central_meridian = _central_meridian_of_zone(zone_number, degree_belt)
+    
+    if engine == 'kruger':
+        return kruger_xy2BLH(x, y, ell, central_meridian, false_easting, false_northing, out=out)
+    
+    a, e2, e_prime2 = ell.a, ell.e2, ell.e_prime2
+    f2, f4, f6 = ell.footpoint_coeffs
+    
+    # 还原坐标（减去偏移量）
+    x_f = x - false_northing
+    y_f = y - false_easting
+    
+    # 计算底点纬度的初始值（Bf）
+    Mf = x_f  # 子午线弧长
+    mu = Mf / ell.mu_divisor
+    
+    # 计算底点纬度
+    Bf = mu + f2 * np.sin(2*mu) + f4 * np.sin(4*mu) + f6 * np.sin(6*mu)
+    
+    # 计算辅助参数
+    sin_Bf = np.sin(Bf)
+    cos_Bf = np.cos(Bf)
+    tan_Bf = np.tan(Bf)
+    
+    Nf = a / np.sqrt(1 - e2 * sin_Bf**2)  # 卯酉圈曲率半径
+    eta2 = e_prime2 * cos_Bf**2
+    tf = tan_Bf
+    
+    # 计算经度偏差
+    l = y_f / (Nf * cos_Bf) * (1 - y_f**2/(6 * Nf**2 * cos_Bf**2) * (1 + 2*tf**2 + eta2) \
+        + y_f**4/(120 * Nf**4 * cos_Bf**4) * (5 + 28*tf**2 + 24*tf**4 + 6*eta2 + 8*eta2*tf**2))
+    
+    # 计算纬度偏差
+    B = np.subtract(Bf, (y_f**2 * tf / (2 * Nf**2)) * (1 - y_f**2/(12 * Nf**2 * cos_Bf**2) * (5 + 3*tf**2 + eta2 - 9*eta2*tf**2) \
+        + y_f**4/(360 * Nf**4 * cos_Bf**4) * (61 + 90*tf**2 + 45*tf**4)), out=B_out)
+    
+    # 计算经度
+    L = np.add(central_meridian, l, out=L_out)
+    
+    return B, L
+
+def blh2xyz_into(B, L, H, ell, X, Y, Z, tmp):
+    """BLH→XYZ，结果写入X、Y、Z缓冲区，tmp为同形状的临时缓冲区"""
+    # Z暂存sinB，tmp暂存卯酉圈曲率半径N
+    np.sin(B, out=Z)
+    np.multiply(Z, Z, out=tmp)
+    tmp *= -ell.e2
+    tmp += 1
+    np.sqrt(tmp, out=tmp)
+    np.divide(ell.a, tmp, out=tmp)
+    np.add(tmp, H, out=X)
+    
+    # Z = (N(1-e2)+H)·sinB
+    tmp *= 1 - ell.e2
+    tmp += H
+    Z *= tmp
+    
+    # X = (N+H)·cosB·cosL, Y = (N+H)·cosB·sinL
+    np.cos(B, out=tmp)
+    X *= tmp
+    np.sin(L, out=Y)
+    Y *= X
+    np.cos(L, out=tmp)
+    X *= tmp
+
+def _check_out(out, n):
+    """检查并拆分out参数，未提供时返回n个None"""
+    if out is None:
+        return (None,) * n
+    if len(out) != n:
+        raise ValueError(f"out应为包含{n}个数组的元组")
+    return tuple(out)
+
+def _overlaps(out, inputs):
+    """输出数组是否可能与输入数组共用内存"""
+    return any(np.may_share_memory(o, c) for o in out for c in inputs)
+
+def _check_engine(engine):
+    """检查投影计算引擎名称"""
+    if engine not in PROJECTION_ENGINES:
+        raise ValueError(f"不支持的投影计算引擎: {engine}，可选 {PROJECTION_ENGINES}")
+
+def _zone_of_longitude(L, degree_belt):
+    """按经度逐点计算带号"""
+    width = 3 if degree_belt == 3 else 6
+    zone_number = np.floor(np.degrees(L) / width).astype(int) + 1
+    return zone_number[()]
+
+def _zone_of_central_meridian(central_meridian, degree_belt):
+    """由中央经线反算带号"""
+    if degree_belt == 3:
+        zone_number = np.rint((np.degrees(central_meridian) + 1.5) / 3).astype(int)
+    else:
+        zone_number = np.rint((np.degrees(central_meridian) + 3) / 6).astype(int)
+    return zone_number[()]
+
+def _central_meridian_of_zone(zone_number, degree_belt):
+    """由带号计算中央经线(弧度)"""
+    if degree_belt == 3:
+        # 3度带
+        return (np.asarray(zone_number) * 3 - 1.5) * np.pi / 180
+    # 6度带
+    return (np.asarray(zone_number) * 6 - 3) * np.pi / 180
@@ -0,0 +1,105 @@
+import numpy as np
+from .ellipsoid import get_ellipsoid
+
+def kruger_BLH2xy(B, L, ellipsoid, central_meridian, false_easting=500000, false_northing=0, out=None):
+    """
+    基于Krüger n级数(展开至n^6)的高斯投影正算
+    
+    三角级数均由Clenshaw递推求和，每个点只需一对sin/cos及一次复数sin/cos，
+    在6°带全带范围内精度优于0.1毫米。
+    
+    参数:
+    B: float 或 numpy.ndarray, 大地纬度(弧度)
+    L: float 或 numpy.ndarray, 大地经度(弧度)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    central_meridian: float 或 numpy.ndarray, 中央经线(弧度)
+    false_easting: float, 东偏移(默认500000米)
+    false_northing: float, 北偏移(默认0米)
+    out: tuple, 可选的预分配输出数组 (y, x)，结果直接写入其中
+    
+    返回:
+    tuple: (y, x) 高斯投影坐标，y为东坐标，x为北坐标(米)
+    """
+    ell = get_ellipsoid(ellipsoid)
+    
+    # 计算经差l
+    l = L - central_meridian
+    
+    # 大地纬度→等角纬度，由一对sin/cos得到sin2B、cos2B
+    sin_B = np.sin(B)
+    cos_B = np.cos(B)
+    chi = B + _clenshaw_sin(ell.conformal_coeffs, 2*sin_B*cos_B, 1 - 2*sin_B**2)
+    
+    # 球面横轴墨卡托坐标
+    cos_chi = np.cos(chi)
+    xi_p = np.arctan2(np.sin(chi), cos_chi * np.cos(l))
+    eta_p = np.arctanh(cos_chi * np.sin(l))
+    
+    # 椭球改正 zeta = zeta' + sum(alpha_j·sin2j·zeta')
+    zeta_p = xi_p + 1j*eta_p
+    zeta = zeta_p + _clenshaw_sin(ell.kruger_alpha, np.sin(2*zeta_p), np.cos(2*zeta_p))
+    
+    y_out, x_out = (None, None) if out is None else out
+    x = np.multiply(ell.rectifying_radius, zeta.real, out=x_out)
+    x += false_northing
+    y = np.multiply(ell.rectifying_radius, zeta.imag, out=y_out)
+    y += false_easting
+    
+    return y, x  # 注意：y为东坐标，x为北坐标
+
+def kruger_xy2BLH(x, y, ellipsoid, central_meridian, false_easting=500000, false_northing=0, out=None):
+    """
+    基于Krüger n级数(展开至n^6)的高斯投影反算
+    
+    与 kruger_BLH2xy 互为逆运算，不截断底点纬度级数。
+    
+    参数:
+    x: float 或 numpy.ndarray, 北坐标(米)
+    y: float 或 numpy.ndarray, 东坐标(米)
+    ellipsoid: str 或 Ellipsoid, 椭球名称或椭球对象
+    central_meridian: float 或 numpy.ndarray, 中央经线(弧度)
+    false_easting: float, 东偏移(默认500000米)
+    false_northing: float, 北偏移(默认0米)
+    out: tuple, 可选的预分配输出数组 (B, L)，结果直接写入其中
+    
+    返回:
+    tuple: (B, L) 大地纬度(弧度)、大地经度(弧度)
+    """
+    ell = get_ellipsoid(ellipsoid)
+    
+    # 还原坐标（减去偏移量）并归一化
+    xi = (np.asarray(x, dtype=np.float64) - false_northing) / ell.rectifying_radius
+    eta = (np.asarray(y, dtype=np.float64) - false_easting) / ell.rectifying_radius
+    
+    # 去除椭球改正 zeta' = zeta - sum(beta_j·sin2j·zeta)
+    zeta = xi + 1j*eta
+    zeta_p = zeta - _clenshaw_sin(ell.kruger_beta, np.sin(2*zeta), np.cos(2*zeta))
+    xi_p = zeta_p.real
+    eta_p = zeta_p.imag
+    
+    # 球面反算得到等角纬度与经差
+    chi = np.arcsin(np.sin(xi_p) / np.cosh(eta_p))
+    l = np.arctan2(np.sinh(eta_p), np.cos(xi_p))
+    
+    # 等角纬度→大地纬度
+    sin_chi = np.sin(chi)
+    cos_chi = np.cos(chi)
+    B_out, L_out = (None, None) if out is None else out
+    B = np.add(chi, _clenshaw_sin(ell.geodetic_coeffs, 2*sin_chi*cos_chi, 1 - 2*sin_chi**2), out=B_out)
+    
+    L = np.add(central_meridian, l, out=L_out)
+    
+    return B, L
+
+def _clenshaw_sin(coeffs, sin_2x, cos_2x):
+    """
+    Clenshaw递推计算 sum(c_j·sin(2j·x))，j = 1..len(coeffs)
+    
+    只需sin2x与cos2x，复数输入同样适用
+    """
+    two_cos = 2 * cos_2x
+    b1 = 0
+    b2 = 0
+    for c in reversed(coeffs):
+        b1, b2 = c + two_cos*b1 - b2, b1
+    return b1 * sin_2x
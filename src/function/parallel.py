@@ -0,0 +1,349 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from .pipeline import seven_param_pipeline
+from .seven_par import seven_par_matrix
+from .four_par import transform_points_four_par
+
+# 点数少于此值时不启动进程池，直接在当前进程计算
+MIN_PARALLEL_POINTS = 200_000
+
+# 线程池每个任务的点数，使一个任务的各列及临时数组能驻留在缓存中
+THREAD_TASK_POINTS = 65536
+
+# 并行方式
+BACKENDS = (
+    'process',  # 进程池 + 共享内存，适合千万点以上的大批量转换
+    'thread',   # 线程池，NumPy运算期间释放GIL，无进程启动与数据复制开销，适合中等批量
+)
+
+class ProcessPoolEngine:
+    """
+    持有进程池与共享内存的批量转换引擎，多次调用 run 时复用同一组工作进程
+
+    首次需要并行计算时创建一块可容纳capacity个点的共享内存
+    (multiprocessing.shared_memory)并启动进程池，各工作进程启动时映射这块内存并一次性
+    载入转换参数，之后每次 run 只把输入复制进共享内存，向各进程分发 (起点, 终点) 偏移，
+    在共享内存上就地计算，数组本身不经过pickle传递。超过capacity的输入按capacity分段处理。
+    用完后调用 close() 或以 with 语句使用，结束工作进程并释放共享内存。
+
+    一般通过 seven_param_engine、four_par_engine 创建。
+
+    参数:
+    kernel: str, 转换内核名称，'seven' 或 'four'
+    settings: dict, 传给转换内核的参数
+    n_inputs: int, 输入分量个数
+    n_outputs: int, 输出分量个数
+    workers: int, 工作进程数，默认为CPU核数
+    capacity: int, 共享内存可容纳的点数，默认为首次并行计算的点数
+    """
+
+    def __init__(self, kernel, settings, n_inputs, n_outputs, workers=None, capacity=None):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity必须为正整数")
+        self.kernel = kernel
+        self.settings = settings
+        self.n_inputs = n_inputs
+        self.n_outputs = n_outputs
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = capacity
+        self._shm = None
+        self._buffer = None
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def run(self, inputs, out=None, task_size=None):
+        """
+        转换一批坐标
+
+        参数:
+        inputs: tuple, 输入的各分量数组
+        out: tuple, 可选的预分配输出数组，结果写入其中
+        task_size: int, 每个任务的点数，默认将每段均分为每个进程4个任务
+
+        返回:
+        tuple: 输出的各分量
+        """
+        inputs, out = _check_arrays(inputs, self.n_outputs, out)
+        shape = inputs[0].shape
+        n_points = inputs[0].size
+        if task_size is not None and task_size <= 0:
+            raise ValueError("task_size必须为正整数")
+
+        # 点数较少或单进程时，进程间调度的开销大于收益
+        if self.workers <= 1 or n_points < MIN_PARALLEL_POINTS:
+            return _run_serial(self.kernel, self.settings, inputs, self.n_outputs, out)
+
+        self._start(n_points)
+        outputs = out if out is not None else tuple(np.empty(shape) for _ in range(self.n_outputs))
+        flat_inputs = tuple(c.reshape(-1) for c in inputs)
+        flat_outputs = tuple(o.reshape(-1) for o in outputs)
+        direct = all(np.shares_memory(o, f) for o, f in zip(outputs, flat_outputs))
+        if not direct:
+            flat_outputs = tuple(np.empty(n_points) for _ in range(self.n_outputs))
+
+        source = self._buffer[:self.n_inputs]
+        result = self._buffer[self.n_inputs:]
+        for begin in range(0, n_points, self.capacity):
+            k = min(self.capacity, n_points - begin)
+            for row, c in zip(source, flat_inputs):
+                row[:k] = c[begin:begin + k]
+
+            size = task_size or -(-k // (self.workers * 4))
+            starts = range(0, k, size)
+            stops = [min(start + size, k) for start in starts]
+            for _ in self._executor.map(_run_task, starts, stops):
+                pass
+
+            for o, row in zip(flat_outputs, result):
+                o[begin:begin + k] = row[:k]
+
+        if not direct:
+            for o, f in zip(outputs, flat_outputs):
+                o[...] = f.reshape(shape)
+        return outputs if out is not None else tuple(o[()] for o in outputs)
+
+    def close(self):
+        """结束工作进程并释放共享内存，可重复调用"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shm is not None:
+            # 共享内存上的数组视图须先释放才能关闭
+            self._buffer = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _start(self, n_points):
+        """首次并行计算时创建共享内存并启动进程池"""
+        if self._executor is not None:
+            return
+        if self.capacity is None:
+            self.capacity = n_points
+        rows = self.n_inputs + self.n_outputs
+        self._shm = SharedMemory(create=True, size=8 * self.capacity * rows)
+        try:
+            self._buffer = np.ndarray((rows, self.capacity), dtype=np.float64, buffer=self._shm.buf)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self._shm.name, self.n_inputs, self.n_outputs, self.capacity, self.kernel, self.settings)
+            )
+        except BaseException:
+            self.close()
+            raise
+
+def seven_param_engine(parameters, source_ellipsoid, target_ellipsoid,
+                       source_type='BLH', target_type='BLH',
+                       source_central_meridian=None, target_central_meridian=None, degree_belt=6,
+                       algorithm='iterative', engine='gauss', rigorous=False, workers=None, capacity=None):
+    """
+    创建七参数转换流水线的进程池引擎，run((c1, c2, c3)) 的结果同 seven_param_pipeline
+
+    参数:
+    parameters ~ rigorous: 同 pipeline.seven_param_pipeline
+    workers, capacity: 同 ProcessPoolEngine
+
+    返回:
+    ProcessPoolEngine
+    """
+    settings = _seven_settings(parameters, source_ellipsoid, target_ellipsoid, source_type, target_type,
+                               source_central_meridian, target_central_meridian, degree_belt,
+                               algorithm, engine, rigorous)
+    return ProcessPoolEngine('seven', settings, 3, 3, workers, capacity)
+
+def four_par_engine(params, workers=None, capacity=None):
+    """
+    创建四参数批量转换的进程池引擎，run((x, y)) 的结果同 transform_points_four_par((x, y), params)
+
+    参数:
+    params: 四参数字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+    workers, capacity: 同 ProcessPoolEngine
+
+    返回:
+    ProcessPoolEngine
+    """
+    return ProcessPoolEngine('four', _four_settings(params), 2, 2, workers, capacity)
+
+def parallel_seven_param_pipeline(c1, c2, c3, parameters, source_ellipsoid, target_ellipsoid,
+                                  source_type='BLH', target_type='BLH',
+                                  source_central_meridian=None, target_central_meridian=None, degree_belt=6,
+                                  algorithm='iterative', engine='gauss', rigorous=False,
+                                  workers=None, task_size=None, out=None, backend='process'):
+    """
+    并行的七参数转换流水线，参数与结果同 pipeline.seven_param_pipeline
+
+    backend为'process'时，创建一个临时的 ProcessPoolEngine 完成转换后关闭；
+    需要分多次转换时应直接使用 seven_param_engine，避免每次重启工作进程。
+    backend为'thread'时，按缓存大小的区间切分数组，在线程池中直接读写调用方的数组。
+
+    参数:
+    c1 ~ rigorous: 同 seven_param_pipeline
+    workers: int, 工作进程(线程)数，默认为CPU核数
+    task_size: int, 每个任务的点数，进程池默认将全部点均分为每个进程4个任务，
+        线程池默认为 THREAD_TASK_POINTS
+    out: tuple, 可选的预分配输出数组，结果写入其中
+    backend: str, 并行方式，'process' 或 'thread'
+
+    返回:
+    tuple: 目标坐标的三个分量
+    """
+    _check_backend(backend)
+    if backend == 'thread':
+        settings = _seven_settings(parameters, source_ellipsoid, target_ellipsoid, source_type, target_type,
+                                   source_central_meridian, target_central_meridian, degree_belt,
+                                   algorithm, engine, rigorous)
+        return _run_threaded('seven', settings, (c1, c2, c3), 3, workers, task_size, out)
+    with seven_param_engine(parameters, source_ellipsoid, target_ellipsoid, source_type, target_type,
+                            source_central_meridian, target_central_meridian, degree_belt,
+                            algorithm, engine, rigorous, workers) as pool:
+        return pool.run((c1, c2, c3), out, task_size)
+
+def parallel_transform_four_par(x, y, params, workers=None, task_size=None, out=None, backend='process'):
+    """
+    并行的四参数批量转换，结果同 transform_points_four_par((x, y), params)
+
+    并行方式与任务划分同 parallel_seven_param_pipeline，多次转换时应直接使用 four_par_engine。
+
+    参数:
+    x, y: numpy.ndarray, 源坐标
+    params: 四参数字典 ('a', 'b', 'dx', 'dy') 或 [a, b, dx, dy]
+    workers: int, 工作进程(线程)数，默认为CPU核数
+    task_size: int, 每个任务的点数
+    out: tuple, 可选的预分配输出数组 (X, Y)
+    backend: str, 并行方式，'process' 或 'thread'
+
+    返回:
+    tuple: 转换后的 (X, Y)
+    """
+    _check_backend(backend)
+    if backend == 'thread':
+        return _run_threaded('four', _four_settings(params), (x, y), 2, workers, task_size, out)
+    with four_par_engine(params, workers) as pool:
+        return pool.run((x, y), out, task_size)
+
+def _seven_settings(parameters, source_ellipsoid, target_ellipsoid, source_type, target_type,
+                    source_central_meridian, target_central_meridian, degree_belt, algorithm, engine, rigorous):
+    """七参数转换内核的参数，在工作进程启动时传入一次"""
+    return {
+        'parameters': np.asarray(parameters, dtype=np.float64),
+        'source_ellipsoid': source_ellipsoid,
+        'target_ellipsoid': target_ellipsoid,
+        'source_type': source_type,
+        'target_type': target_type,
+        'source_central_meridian': source_central_meridian,
+        'target_central_meridian': target_central_meridian,
+        'degree_belt': degree_belt,
+        'algorithm': algorithm,
+        'engine': engine,
+        'rigorous': rigorous,
+    }
+
+def _four_settings(params):
+    """四参数转换内核的参数"""
+    if not isinstance(params, dict):
+        params = dict(zip(('a', 'b', 'dx', 'dy'), params))
+    return {'params': params}
+
+def _seven_kernel(inputs, outputs, settings):
+    seven_param_pipeline(*inputs, out=outputs, **settings)
+
+def _four_kernel(inputs, outputs, settings):
+    transform_points_four_par(inputs, settings['params'], out=outputs)
+
+_KERNELS = {
+    'seven': _seven_kernel,
+    'four': _four_kernel,
+}
+
+# 工作进程的全局状态，由 _init_worker 在进程启动时设置
+_worker_state = {}
+
+def _init_worker(shm_name, n_inputs, n_outputs, capacity, kernel, settings):
+    """工作进程初始化：映射共享内存，载入转换参数"""
+    shm = SharedMemory(name=shm_name)
+    buffer = np.ndarray((n_inputs + n_outputs, capacity), dtype=np.float64, buffer=shm.buf)
+    _worker_state.update(
+        shm=shm,
+        inputs=buffer[:n_inputs],
+        outputs=buffer[n_inputs:],
+        kernel=_KERNELS[kernel],
+        settings=settings,
+    )
+    if kernel == 'seven':
+        # 七参数矩阵在每个进程中只构建一次
+        seven_par_matrix(settings['parameters'], settings['rigorous'])
+
+def _run_task(start, stop):
+    """在共享内存的 [start, stop) 区间上就地计算"""
+    state = _worker_state
+    inputs = tuple(c[start:stop] for c in state['inputs'])
+    outputs = tuple(c[start:stop] for c in state['outputs'])
+    state['kernel'](inputs, outputs, state['settings'])
+    return stop - start
+
+def _check_backend(backend):
+    """检查并行方式名称"""
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的并行方式: {backend}，可选 {BACKENDS}")
+
+def _check_arrays(inputs, n_outputs, out):
+    """将输入广播为同形状的浮点数组，并检查out的个数与形状"""
+    inputs = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in inputs))
+    shape = inputs[0].shape
+    if out is not None:
+        out = tuple(out)
+        if len(out) != n_outputs or any(np.shape(o) != shape for o in out):
+            raise ValueError(f"out应为包含{n_outputs}个形状为{shape}的数组的元组")
+    return inputs, out
+
+def _run_serial(kernel, settings, inputs, n_outputs, out):
+    """在当前进程中直接计算"""
+    outputs = out if out is not None else tuple(np.empty(inputs[0].shape) for _ in range(n_outputs))
+    _KERNELS[kernel](tuple(inputs), outputs, settings)
+    return outputs if out is not None else tuple(o[()] for o in outputs)
+
+def _run_threaded(kernel, settings, inputs, n_outputs, workers, task_size, out):
+    """按区间在线程池中计算，各线程直接读写输入输出数组的切片"""
+    if task_size is not None and task_size <= 0:
+        raise ValueError("task_size必须为正整数")
+    inputs, out = _check_arrays(inputs, n_outputs, out)
+    shape = inputs[0].shape
+    n_points = inputs[0].size
+    workers = workers or os.cpu_count() or 1
+    task_size = task_size or THREAD_TASK_POINTS
+
+    # 点数较少或单线程时，线程调度的开销大于收益
+    if workers <= 1 or n_points < 2 * task_size:
+        return _run_serial(kernel, settings, inputs, n_outputs, out)
+
+    outputs = out if out is not None else tuple(np.empty(shape) for _ in range(n_outputs))
+
+    # 拉平为一维视图，非连续的数组先在连续的缓冲区中计算，再复制回去
+    flat_inputs = tuple(c.reshape(-1) for c in inputs)
+    flat_outputs = tuple(o.reshape(-1) for o in outputs)
+    direct = all(np.shares_memory(o, f) for o, f in zip(outputs, flat_outputs))
+    if not direct:
+        flat_outputs = tuple(np.empty(n_points) for _ in range(n_outputs))
+
+    run = _KERNELS[kernel]
+    def task(start):
+        rows = slice(start, start + task_size)
+        run(tuple(c[rows] for c in flat_inputs), tuple(o[rows] for o in flat_outputs), settings)
+
+    starts = range(0, n_points, task_size)
+    with ThreadPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+        for _ in executor.map(task, starts):
+            pass
+
+    if not direct:
+        for o, f in zip(outputs, flat_outputs):
+            o[...] = f.reshape(shape)
+    return outputs if out is not None else tuple(o[()] for o in outputs)
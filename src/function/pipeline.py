@@ -0,0 +1,145 @@
+import numpy as np
+from .ellipsoid import get_ellipsoid
+from .geodetic import XYZ2BLH, BLH2xy, xy2BLH, blh2xyz_into
+from .seven_par import seven_par_matrix
+
+# 流水线支持的坐标类型
+COORD_TYPES = (
+    'XYZ',  # 空间直角坐标 (X, Y, Z)
+    'BLH',  # 大地坐标 (B, L, H)，B、L为弧度
+    'xy',   # 高斯投影平面坐标 (x, y, h)，x为北坐标，y为东坐标，h为大地高
+)
+
+def seven_param_pipeline(c1, c2, c3, parameters, source_ellipsoid, target_ellipsoid,
+                         source_type='BLH', target_type='BLH',
+                         source_central_meridian=None, target_central_meridian=None, degree_belt=6,
+                         algorithm='iterative', engine='gauss', chunk_size=65536, out=None, rigorous=False,
+                         zone_out=None):
+    """
+    融合的七参数转换流水线：源坐标→XYZ→七参数→XYZ→BLH→高斯投影
+    
+    整条转换链按块单遍完成，各阶段通过out参数在同一组可复用的临时缓冲区上计算，
+    每块的中间结果驻留在缓存中，不再为每个阶段分配整列的中间数组。
+    
+    参数:
+    c1, c2, c3: numpy.ndarray, 源坐标的三个分量，含义由source_type决定
+    parameters: numpy.ndarray, shape (7,)
+        七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    source_ellipsoid: str 或 Ellipsoid, 源椭球
+    target_ellipsoid: str 或 Ellipsoid, 目标椭球
+    source_type: str, 源坐标类型，'XYZ'、'BLH' 或 'xy'
+    target_type: str, 目标坐标类型，'XYZ'、'BLH' 或 'xy'
+    source_central_meridian: float, 源平面坐标的中央经线(弧度)，source_type为'xy'时使用
+    target_central_meridian: float, 目标平面坐标的中央经线(弧度)，为None时按degree_belt自动分带
+    degree_belt: int, 投影带宽，3度带或6度带
+    algorithm: str, XYZ转BLH算法，见 geodetic.XYZ2BLH_ALGORITHMS
+    engine: str, 高斯投影计算引擎，见 geodetic.PROJECTION_ENGINES
+    chunk_size: int, 每块处理的点数
+    out: tuple, 可选的预分配输出数组，结果直接写入其中
+    rigorous: bool, 七参数是否使用严密旋转矩阵，见 seven_par.seven_par_matrix
+    zone_out: numpy.ndarray, 可选, 与源坐标形状相同的数组，target_type为'xy'时写入每个点的投影带号；
+        target_central_meridian为None时各点按经度自动分带，东坐标只有连同带号才有意义
+    
+    返回:
+    tuple: 目标坐标的三个分量 (XYZ: X, Y, Z；BLH: B, L, H；xy: x, y, h)
+    """
+    for coord_type in (source_type, target_type):
+        if coord_type not in COORD_TYPES:
+            raise ValueError(f"不支持的坐标类型: {coord_type}，可选 {COORD_TYPES}")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size必须为正整数")
+    
+    src = get_ellipsoid(source_ellipsoid)
+    dst = get_ellipsoid(target_ellipsoid)
+    
+    c1, c2, c3 = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in (c1, c2, c3)))
+    shape = c1.shape
+    c1, c2, c3 = c1.reshape(-1), c2.reshape(-1), c3.reshape(-1)
+    n_points = c1.size
+    
+    # 七参数只需构建一次 X' = T + (1+m)·R·X
+    M, T = seven_par_matrix(parameters, rigorous)
+    
+    # 输出数组，提供out时直接写入调用方的缓冲区
+    if out is None:
+        outputs = [np.empty(shape) for _ in range(3)]
+    else:
+        outputs = list(out)
+        if len(outputs) != 3 or any(o.shape != shape for o in outputs):
+            raise ValueError(f"out应为包含3个形状为{shape}的数组的元组")
+    out1, out2, out3 = (o.reshape(-1) for o in outputs)
+    if not all(np.shares_memory(o, f) for o, f in zip(outputs, (out1, out2, out3))):
+        raise ValueError("out中的数组必须是连续存储的")
+    if zone_out is not None:
+        if target_type != 'xy':
+            raise ValueError("zone_out只能用于目标坐标类型为'xy'的转换")
+        if zone_out.shape != shape:
+            raise ValueError(f"zone_out应为形状为{shape}的数组")
+        zones = zone_out.reshape(-1)
+        if not np.shares_memory(zones, zone_out):
+            raise ValueError("zone_out必须是连续存储的")
+    
+    # 各阶段共用的临时缓冲区
+    size = min(chunk_size, n_points)
+    X, Y, Z, tmp, Xt, Yt, Zt = (np.empty(size) for _ in range(7))
+    in_place = out is not None and any(np.may_share_memory(o, c) for o in outputs for c in (c1, c2, c3))
+    
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        k = stop - start
+        s1, s2, s3 = c1[start:stop], c2[start:stop], c3[start:stop]
+        o1, o2, o3 = out1[start:stop], out2[start:stop], out3[start:stop]
+        Xc, Yc, Zc, tc = X[:k], Y[:k], Z[:k], tmp[:k]
+        Xtc, Ytc, Ztc = Xt[:k], Yt[:k], Zt[:k]
+        
+        # 1. 源坐标→源椭球空间直角坐标
+        if source_type == 'XYZ':
+            if in_place:
+                # 输出覆盖输入时先复制到源缓冲区，避免七参数读到已写入的结果
+                np.copyto(Xc, s1)
+                np.copyto(Yc, s2)
+                np.copyto(Zc, s3)
+            else:
+                Xc, Yc, Zc = s1, s2, s3
+        else:
+            if source_type == 'xy':
+                # 目标缓冲区此时空闲，暂存源大地坐标
+                B, L = xy2BLH(s1, s2, src, source_central_meridian, degree_belt, engine=engine, out=(Xtc, Ytc))
+            else:
+                B, L = s1, s2
+            blh2xyz_into(B, L, s3, src, Xc, Yc, Zc, tc)
+        
+        # 2. 七参数转换
+        if target_type == 'XYZ':
+            _helmert_into(M, T, Xc, Yc, Zc, o1, o2, o3, tc)
+            continue
+        _helmert_into(M, T, Xc, Yc, Zc, Xtc, Ytc, Ztc, tc)
+        
+        # 3. 目标椭球空间直角坐标→大地坐标
+        if target_type == 'BLH':
+            XYZ2BLH(Xtc, Ytc, Ztc, dst, algorithm=algorithm, out=(o1, o2, o3))
+            continue
+        
+        # 4. 大地坐标→高斯投影，源缓冲区此时空闲，暂存目标大地坐标
+        Bc, Lc = X[:k], Y[:k]
+        XYZ2BLH(Xtc, Ytc, Ztc, dst, algorithm=algorithm, out=(Bc, Lc, o3))
+        if zone_out is None:
+            BLH2xy(Bc, Lc, dst, target_central_meridian, degree_belt, engine=engine, out=(o2, o1))
+        else:
+            zones[start:stop] = BLH2xy(Bc, Lc, dst, target_central_meridian, degree_belt,
+                                       return_zone=True, engine=engine, out=(o2, o1))[2]
+    
+    if out is not None:
+        return tuple(outputs)
+    
+    return out1.reshape(shape)[()], out2.reshape(shape)[()], out3.reshape(shape)[()]
+
+def _helmert_into(M, T, X, Y, Z, X_out, Y_out, Z_out, tmp):
+    """X' = T + M·X，结果写入输出缓冲区，tmp为临时缓冲区"""
+    for i, out in enumerate((X_out, Y_out, Z_out)):
+        np.multiply(X, M[i, 0], out=out)
+        np.multiply(Y, M[i, 1], out=tmp)
+        out += tmp
+        np.multiply(Z, M[i, 2], out=tmp)
+        out += tmp
+        out += T[i]
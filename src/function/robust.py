@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from math import comb
+
+import numpy as np
+from .seven_par import bursa_seven_parameters, _design_matrix as _seven_design_matrix
+from .four_par import calculate_four_parameters, transform_points_four_par, _design_matrix as _four_design_matrix
+
+# 每个工作线程一次评估的子集个数
+SUBSET_BLOCK_SIZE = 256
+
+# 评分时一次计算的残差元素个数上限(子集数×点数×维数)，限制每个线程的临时内存约为32MB
+RESIDUAL_CHUNK_ELEMENTS = 1 << 22
+
+def robust_seven_parameters(source_coords, target_coords, threshold, subset_size=3,
+                            max_subsets=2000, workers=None, seed=None):
+    """
+    抗粗差的布尔莎七参数解算：子集一致性搜索(RANSAC)后以全部内点重新解算
+    
+    由子集解算的参数计算全部公共点的点位残差，残差小于threshold的点为内点，
+    取内点最多的子集(内点数相同时取截断残差平方和最小者)，再用其内点调用
+    bursa_seven_parameters 迭代重新解算，直到内点集合不再变化。
+    子集总数不超过max_subsets时穷举全部组合，否则随机抽取max_subsets个子集；
+    各子集的法方程按块堆叠一次解算，多个块在线程池中并行计算。
+    
+    参数:
+    source_coords: numpy.ndarray, shape (n,3), 源坐标(XYZ)
+    target_coords: numpy.ndarray, shape (n,3), 目标坐标(XYZ)
+    threshold: float, 内点的点位残差阈值(米)
+    subset_size: int, 每个子集的点数，最少3个
+    max_subsets: int, 评估的子集个数上限
+    workers: int, 并行线程数，默认为CPU核数
+    seed: int, 随机抽样的种子
+    
+    返回:
+    dict: bursa_seven_parameters 的结果(基于全部内点)，另含
+        'inliers': numpy.ndarray, shape (n,), bool, 各点是否为内点
+        'n_subsets': int, 评估的子集个数
+    """
+    source, target = _check_points(source_coords, target_coords, 3)
+    if subset_size < 3:
+        raise ValueError("七参数子集至少需要3个公共点")
+    
+    # 重心化的误差方程，改善各子集法方程的条件数
+    B = _seven_design_matrix(source - source.mean(axis=0)).reshape(-1, 3, 7)
+    L = target - source
+    inliers, n_subsets = _consensus_search(B, L, subset_size, threshold, max_subsets, workers, seed)
+    
+    def refit(mask):
+        result = bursa_seven_parameters(source[mask], target[mask])
+        residuals = _seven_design_matrix(source) @ result['parameters'] - L.reshape(-1)
+        return result, residuals.reshape(-1, 3)
+    
+    return _refit_inliers(refit, inliers, threshold, 3, "七参数", n_subsets)
+
+def robust_four_parameters(source_points, target_points, threshold, subset_size=2,
+                           max_subsets=2000, workers=None, seed=None):
+    """
+    抗粗差的四参数解算：子集一致性搜索(RANSAC)后以全部内点重新解算
+    
+    搜索与重新解算的方式同 robust_seven_parameters，重新解算使用
+    calculate_four_parameters(method='centroid')。
+    
+    参数:
+    source_points: numpy.ndarray, shape (n,2), 源坐标
+    target_points: numpy.ndarray, shape (n,2), 目标坐标
+    threshold: float, 内点的点位残差阈值(米)
+    subset_size: int, 每个子集的点数，最少2个
+    max_subsets: int, 评估的子集个数上限
+    workers: int, 并行线程数，默认为CPU核数
+    seed: int, 随机抽样的种子
+    
+    返回:
+    dict: calculate_four_parameters 的结果(基于全部内点)，另含
+        'inliers': numpy.ndarray, shape (n,), bool, 各点是否为内点
+        'n_subsets': int, 评估的子集个数
+    """
+    source, target = _check_points(source_points, target_points, 2)
+    if subset_size < 2:
+        raise ValueError("四参数子集至少需要2个控制点")
+    
+    B = _four_design_matrix(source - source.mean(axis=0)).reshape(-1, 2, 4)
+    L = target - target.mean(axis=0)
+    inliers, n_subsets = _consensus_search(B, L, subset_size, threshold, max_subsets, workers, seed)
+    
+    def refit(mask):
+        result = calculate_four_parameters(source[mask], target[mask], method='centroid')
+        return result, transform_points_four_par(source, result) - target
+    
+    return _refit_inliers(refit, inliers, threshold, 2, "四参数", n_subsets)
+
+def _check_points(source, target, dim):
+    """检查并转换为 (n,dim) 浮点数组"""
+    source = np.asarray(source, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    if source.shape != target.shape or source.ndim != 2 or source.shape[1] != dim:
+        raise ValueError(f"输入坐标数组格式不正确，应为(n,{dim})的数组")
+    return source, target
+
+def _refit_inliers(refit, inliers, threshold, min_points, name, n_subsets, max_iter=10):
+    """以内点重新解算，并按新参数重新划分内点，直到内点集合不再变化"""
+    for _ in range(max_iter):
+        if np.count_nonzero(inliers) < min_points:
+            raise ValueError(f"内点不足{min_points}个，无法解算{name}，请检查阈值")
+        result, residuals = refit(inliers)
+        updated = np.sqrt(np.sum(residuals**2, axis=1)) < threshold
+        if np.array_equal(updated, inliers) or np.count_nonzero(updated) < min_points:
+            break
+        inliers = updated
+    
+    result['inliers'] = inliers
+    result['n_subsets'] = n_subsets
+    return result
+
+def _consensus_search(B, L, subset_size, threshold, max_subsets, workers, seed):
+    """
+    子集一致性搜索
+    
+    参数:
+    B: numpy.ndarray, shape (n,dim,u), 各点的误差方程系数
+    L: numpy.ndarray, shape (n,dim), 各点的观测值
+    
+    返回:
+    tuple: (最优子集的内点掩码, 评估的子集个数)
+    """
+    n_points, dim = B.shape[:2]
+    if n_points < subset_size:
+        raise ValueError(f"公共点个数({n_points})少于子集点数({subset_size})")
+    
+    # 各点对法方程的贡献，子集的法方程为其成员贡献之和
+    N_points = np.einsum('nki,nkj->nij', B, B)
+    W_points = np.einsum('nki,nk->ni', B, L)
+    
+    # 子集总数不多时穷举，否则随机抽样
+    total = comb(n_points, subset_size)
+    if total <= max_subsets:
+        subsets = np.array(list(combinations(range(n_points), subset_size)), dtype=np.intp)
+    else:
+        rng = np.random.default_rng(seed)
+        subsets = np.array([rng.choice(n_points, subset_size, replace=False) for _ in range(max_subsets)])
+    
+    def evaluate(block):
+        N = N_points[block].sum(axis=1)
+        W = W_points[block].sum(axis=1)
+        # 退化子集(法方程奇异)用最小二乘解代替，其内点数自然很少
+        try:
+            x = np.linalg.solve(N, W[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError:
+            x = np.array([np.linalg.lstsq(n, w, rcond=None)[0] for n, w in zip(N, W)])
+        
+        # 评分：内点个数，相同时比较截断残差平方和(MSAC)
+        # 公共点按块计算残差并累加，临时数组不随点数增长
+        count = np.zeros(len(block), dtype=np.intp)
+        cost = np.zeros(len(block))
+        step = max(1, RESIDUAL_CHUNK_ELEMENTS // (len(block) * dim))
+        for start in range(0, n_points, step):
+            rows = slice(start, start + step)
+            residuals = np.einsum('nki,si->snk', B[rows], x) - L[rows]
+            distance2 = np.sum(residuals**2, axis=2)
+            count += np.count_nonzero(distance2 < threshold**2, axis=1)
+            cost += np.minimum(distance2, threshold**2).sum(axis=1)
+        best = np.lexsort((cost, -count))[0]
+        return count[best], cost[best], x[best]
+    
+    blocks = [subsets[i:i + SUBSET_BLOCK_SIZE] for i in range(0, len(subsets), SUBSET_BLOCK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, len(blocks))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            candidates = list(executor.map(evaluate, blocks))
+    else:
+        candidates = [evaluate(block) for block in blocks]
+    
+    _, _, x = min(candidates, key=lambda c: (-c[0], c[1]))
+    distance2 = np.sum((B @ x - L)**2, axis=1)
+    return distance2 < threshold**2, len(subsets)
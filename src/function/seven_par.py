@@ -1,6 +1,8 @@
 import numpy as np
+from functools import lru_cache
+from .diagnostics import point_diagnostics
 
-def bursa_seven_parameters(source_coords, target_coords):
+def bursa_seven_parameters(source_coords, target_coords, diagnostics=False):
     """
     计算布尔莎七参数转换参数及精度评估
     
@@ -9,6 +11,8 @@ def bursa_seven_parameters(source_coords, target_coords):
         源坐标系中的坐标点列表，必须是空间直角坐标系(XYZ)格式
     target_coords: numpy.ndarray, shape (n,3)
         目标坐标系中的坐标点列表，必须是空间直角坐标系(XYZ)格式
+    diagnostics: bool
+        是否计算逐点粗差诊断量('leverage'等三项)，需构建完整误差方程并逐点分解，默认不计算
     
     返回:
     dict: 包含以下键值:
@@ -24,10 +28,19 @@ def bursa_seven_parameters(source_coords, target_coords):
                 'y_stats': [min, max, mean, std],
                 'z_stats': [min, max, mean, std]
             }
+        'covariance': numpy.ndarray, shape (7,7)
+            参数协方差矩阵 σ0²·N⁻¹，参数顺序同'parameters'
+        'leverage': numpy.ndarray, shape (n,)
+            各点的杠杆值
+        'loo_residuals': numpy.ndarray, shape (n,3)
+            留一残差，即去掉该点重新解算时该点的残差
+        'standardized_residuals': numpy.ndarray, shape (n,3)
+            Baarda标准化残差(w检验统计量)
+        以上三项诊断量仅在diagnostics=True时返回，含义见 diagnostics.point_diagnostics
     """
     # 1. 确保输入数据是numpy数组且形状正确
-    source = np.array(source_coords)
-    target = np.array(target_coords)
+    source = np.array(source_coords, dtype=np.float64)
+    target = np.array(target_coords, dtype=np.float64)
     
     if source.shape != target.shape or len(source.shape) != 2 or source.shape[1] != 3:
         raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
@@ -35,29 +48,22 @@ def bursa_seven_parameters(source_coords, target_coords):
     n_points = source.shape[0]
     if n_points < 3:
         raise ValueError("至少需要3个公共点进行七参数转换")
-
-    # 2. 构建系数矩阵B和观测向量L
-    B = np.zeros((n_points * 3, 7))
-    L = np.zeros(n_points * 3)
     
-    for i in range(n_points):
-        # 构建每个点的系数矩阵
-        B[i*3:i*3+3, 0:3] = np.eye(3)  # ΔX₀, ΔY₀, ΔZ₀的系数
-        B[i*3:i*3+3, 3] = [0, -source[i,2], source[i,1]]  # εx的系数
-        B[i*3:i*3+3, 4] = [source[i,2], 0, -source[i,0]]  # εy的系数
-        B[i*3:i*3+3, 5] = [-source[i,1], source[i,0], 0]  # εz的系数
-        B[i*3:i*3+3, 6] = source[i]  # m的系数
-        
-        # 构建观测向量
-        L[i*3:i*3+3] = target[i] - source[i]
-
-    # 3. 最小二乘解算
+    # 2. 构建系数矩阵B和观测向量L，源坐标重心化以改善法方程的条件数
+    center = source.mean(axis=0)
+    B = _design_matrix(source - center)
+    L = (target - source).reshape(-1)
+    
+    # 3. 最小二乘解算，一次分解同时得到参数与法方程逆阵Q
     N = B.T @ B
     W = B.T @ L
-    parameters = np.linalg.solve(N, W)
-
+    solution = np.linalg.solve(N, np.column_stack((W, np.eye(7))))
+    shifted = solution[:, 0]
+    Q = solution[:, 1:]
+    parameters = _restore_translation(shifted, center)
+    
     # 4. 计算残差
-    V = B @ parameters - L
+    V = B @ shifted - L
     residuals = V.reshape(-1, 3)
     
     # 5. 计算中误差
@@ -73,15 +79,684 @@ def bursa_seven_parameters(source_coords, target_coords):
         'z_stats': [np.min(residuals[:,2]), np.max(residuals[:,2]),
                    np.mean(residuals[:,2]), np.std(residuals[:,2])]
     }
+    
+    result = {
+        'parameters': parameters,
+        'residuals': residuals,
+        'rms': sigma0,
+        'stats': stats,
+        'covariance': _restore_covariance(Q, center, sigma0)
+    }
+    if diagnostics:
+        result.update(point_diagnostics(B, Q, V, sigma0, 3))
+    return result
 
+def rigorous_seven_parameters(source_coords, target_coords, tol=1e-12, max_iter=10):
+    """
+    严密布尔莎七参数解算，适用于任意大小的旋转角
+    
+    模型为 X' = T + (1+m)·R·X，R = Rz(εz)·Ry(εy)·Rx(εx) 为严密旋转矩阵，不做小角度近似。
+    先由Horn/SVD闭合解得到初值(等权时即为最小二乘解)，再用Gauss-Newton迭代精化，
+    通常1~2次即收敛；雅可比矩阵对全部点一次向量化构建，旋转按 R ← exp([δ]×)·R 更新。
+    结果用 transform_points_seven_par(..., rigorous=True) 进行转换。
+    
+    参数:
+    source_coords: numpy.ndarray, shape (n,3)
+        源坐标系中的坐标点列表，必须是空间直角坐标系(XYZ)格式
+    target_coords: numpy.ndarray, shape (n,3)
+        目标坐标系中的坐标点列表，必须是空间直角坐标系(XYZ)格式
+    tol: float, 收敛阈值，旋转(弧度)与尺度的改正数及平移改正数相对点位分布范围均小于该值时停止
+    max_iter: int, 最大迭代次数
+    
+    返回:
+    dict: 包含以下键值:
+        'parameters': numpy.ndarray, shape (7,)
+            七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]，εy接近±90°时欧拉角分解奇异
+        'rotation_matrix': numpy.ndarray, shape (3,3)
+            旋转矩阵R
+        'residuals': numpy.ndarray, shape (n,3)
+            残差 [X误差, Y误差, Z误差]，即转换值减目标值
+        'rms': float
+            中误差
+        'stats': dict
+            与 bursa_seven_parameters 相同格式的各方向残差统计信息
+        'covariance': numpy.ndarray, shape (7,7)
+            参数协方差矩阵，参数顺序同'parameters'；由最后一次Gauss-Newton法方程的逆阵
+            σ0²·(JᵀJ)⁻¹ 经 [t, δθ, s] → [T, 欧拉角, m] 的雅可比传播得到，εy接近±90°时奇异
+        'iterations': int
+            Gauss-Newton迭代次数
+    """
+    source = np.array(source_coords, dtype=np.float64)
+    target = np.array(target_coords, dtype=np.float64)
+    
+    if source.shape != target.shape or len(source.shape) != 2 or source.shape[1] != 3:
+        raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+    
+    n_points = source.shape[0]
+    if n_points < 3:
+        raise ValueError("至少需要3个公共点进行七参数转换")
+    
+    # 1. 重心化，模型变为 y = t + s·R·x
+    center_s = source.mean(axis=0)
+    center_t = target.mean(axis=0)
+    x = source - center_s
+    y = target - center_t
+    
+    # 2. Horn/SVD闭合解作为初值
+    U, S, Vt = np.linalg.svd(x.T @ y)
+    D = np.diag([1.0, 1.0, np.sign(np.linalg.det(Vt.T @ U.T))])
+    R = Vt.T @ D @ U.T
+    spread = np.sum(x**2)
+    if spread == 0:
+        raise ValueError("公共点重合，无法计算七参数")
+    scale = np.trace(np.diag(S) @ D) / spread
+    t = np.zeros(3)
+    
+    # 3. Gauss-Newton迭代，参数改正数为 [δt, δθ, δs]
+    tolerance = np.r_[np.full(3, tol * np.sqrt(spread / n_points)), np.full(4, tol)]
+    J = np.zeros((n_points, 3, 7))
+    J[:, [0, 1, 2], [0, 1, 2]] = 1
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        q = x @ R.T
+        residuals = y - (t + scale * q)
+        
+        # 雅可比: ∂/∂δθ = -s·[q]×，∂/∂s = q
+        J[:, 0, 4] = scale * q[:, 2]
+        J[:, 0, 5] = -scale * q[:, 1]
+        J[:, 1, 3] = -scale * q[:, 2]
+        J[:, 1, 5] = scale * q[:, 0]
+        J[:, 2, 3] = scale * q[:, 1]
+        J[:, 2, 4] = -scale * q[:, 0]
+        J[:, :, 6] = q
+        
+        # 一次分解同时得到改正数与法方程逆阵，收敛时的逆阵即用于精度评估
+        Jf = J.reshape(-1, 7)
+        solution = np.linalg.solve(Jf.T @ Jf, np.column_stack((Jf.T @ residuals.reshape(-1), np.eye(7))))
+        delta = solution[:, 0]
+        
+        t += delta[:3]
+        R = _rodrigues(delta[3:6]) @ R
+        scale += delta[6]
+        if np.all(np.abs(delta) < tolerance):
+            break
+    
+    # 4. 还原为原坐标下的参数 T = 重心' + t - s·R·重心
+    T = center_t + t - scale * R @ center_s
+    parameters = np.r_[T, _euler_angles(R), scale - 1]
+    
+    # 5. 残差与精度评估
+    residuals = (t + scale * (x @ R.T)) - y
+    v_v = np.sum(residuals**2)
+    sigma0 = np.sqrt(v_v / (3 * n_points - 7))
+    stats = {
+        f'{axis}_stats': [np.min(residuals[:, i]), np.max(residuals[:, i]),
+                          np.mean(residuals[:, i]), np.std(residuals[:, i])]
+        for i, axis in enumerate(('x', 'y', 'z'))
+    }
+    
+    # 6. 协方差: 由迭代参数 [t, δθ, s] 传播到 [T, 欧拉角, m]
+    # T = 重心' + t - s·R·重心，δθ左乘扰动下 ∂T/∂δθ = s·[R·重心]×，∂T/∂s = -R·重心
+    q0 = R @ center_s
+    P = np.eye(7)
+    P[:3, 3:6] = scale * np.array([
+        [0, -q0[2], q0[1]],
+        [q0[2], 0, -q0[0]],
+        [-q0[1], q0[0], 0]
+    ])
+    P[:3, 6] = -q0
+    P[3:6, 3:6] = _euler_rates(parameters[3:6])
+    
     return {
         'parameters': parameters,
+        'rotation_matrix': R,
         'residuals': residuals,
         'rms': sigma0,
-        'stats': stats
+        'stats': stats,
+        'covariance': sigma0**2 * (P @ solution[:, 1:] @ P.T),
+        'iterations': iterations
+    }
+
+def _euler_rotation(ex, ey, ez):
+    """严密旋转矩阵 R = Rz(ez)·Ry(ey)·Rx(ex)，小角度时退化为 I + [ε]×"""
+    cx, sx = np.cos(ex), np.sin(ex)
+    cy, sy = np.cos(ey), np.sin(ey)
+    cz, sz = np.cos(ez), np.sin(ez)
+    return np.array([
+        [cz*cy, cz*sy*sx - sz*cx, cz*sy*cx + sz*sx],
+        [sz*cy, sz*sy*sx + cz*cx, sz*sy*cx - cz*sx],
+        [-sy, cy*sx, cy*cx]
+    ])
+
+def _euler_derivatives(ex, ey, ez):
+    """严密旋转矩阵对三个欧拉角的偏导 [∂R/∂εx, ∂R/∂εy, ∂R/∂εz]，shape (3,3,3)"""
+    cx, sx = np.cos(ex), np.sin(ex)
+    cy, sy = np.cos(ey), np.sin(ey)
+    cz, sz = np.cos(ez), np.sin(ez)
+    Rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    Ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    Rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    # 绕各轴旋转的生成元 [x̂]×、[ŷ]×、[ẑ]×，∂Rk/∂εk = [k̂]×·Rk
+    Gx = np.array([[0, 0, 0], [0, 0, -1], [0, 1, 0]])
+    Gy = np.array([[0, 0, 1], [0, 0, 0], [-1, 0, 0]])
+    Gz = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 0]])
+    return np.array([
+        Rz @ Ry @ Gx @ Rx,
+        Rz @ Gy @ Ry @ Rx,
+        Gz @ Rz @ Ry @ Rx
+    ])
+
+def _euler_angles(R):
+    """_euler_rotation 的逆运算，由旋转矩阵分解出 (εx, εy, εz)"""
+    ex = np.arctan2(R[2, 1], R[2, 2])
+    ey = -np.arcsin(np.clip(R[2, 0], -1, 1))
+    ez = np.arctan2(R[1, 0], R[0, 0])
+    return np.array([ex, ey, ez])
+
+def _euler_rates(angles):
+    """
+    欧拉角对左乘旋转扰动 R ← exp([δ]×)·R 的偏导 ∂(εx, εy, εz)/∂δ
+    
+    R = Rz·Ry·Rx 时 δ = εx'·Rz·Ry·x̂ + εy'·Rz·ŷ + εz'·ẑ，对该3×3矩阵求逆，εy = ±90°时奇异
+    """
+    _, ey, ez = angles
+    E = np.array([
+        [np.cos(ez)*np.cos(ey), -np.sin(ez), 0],
+        [np.sin(ez)*np.cos(ey), np.cos(ez), 0],
+        [-np.sin(ey), 0, 1]
+    ])
+    return np.linalg.inv(E)
+
+def _rodrigues(rotation_vector):
+    """旋转向量 → 旋转矩阵 exp([θ]×)"""
+    angle = np.linalg.norm(rotation_vector)
+    K = np.array([
+        [0, -rotation_vector[2], rotation_vector[1]],
+        [rotation_vector[2], 0, -rotation_vector[0]],
+        [-rotation_vector[1], rotation_vector[0], 0]
+    ])
+    if angle < 1e-12:
+        return np.eye(3) + K
+    K /= angle
+    return np.eye(3) + np.sin(angle) * K + (1 - np.cos(angle)) * (K @ K)
+
+def bursa_seven_parameters_streaming(chunks):
+    """
+    分块流式计算布尔莎七参数，内存占用与点数无关
+    
+    第一遍逐块累加 7×7 法方程矩阵与右端向量并解算参数，
+    第二遍逐块计算残差，用Welford/Chan合并公式在线更新各方向的统计量。
+    
+    参数:
+    chunks: 可重复迭代的对象，或每次调用返回新迭代器的函数
+        每次迭代依次产生 (source_chunk, target_chunk)，均为 shape (k,3) 的
+        空间直角坐标数组；需要遍历两次，不能是一次性的迭代器
+    
+    返回:
+    dict: 包含以下键值:
+        'parameters': numpy.ndarray, shape (7,)
+            七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+        'rms': float
+            中误差
+        'stats': dict
+            与 bursa_seven_parameters 相同格式的各方向残差统计信息
+        'n_points': int
+            参与计算的公共点个数
+        'covariance': numpy.ndarray, shape (7,7)
+            参数协方差矩阵 σ0²·N⁻¹，参数顺序同'parameters'
+    """
+    if callable(chunks):
+        make_iter = chunks
+    elif iter(chunks) is chunks:
+        raise ValueError("chunks需要遍历两次，请传入列表等可重复迭代的对象或返回迭代器的函数")
+    else:
+        make_iter = lambda: iter(chunks)
+    
+    # 1. 第一遍：累加法方程，源坐标减去首点以改善法方程的条件数
+    N = np.zeros((7, 7))
+    W = np.zeros(7)
+    n_points = 0
+    origin = None
+    for source, target in _iter_chunks(make_iter()):
+        if origin is None and source.shape[0]:
+            origin = source[0].copy()
+        if origin is None:
+            continue
+        B = _design_matrix(source - origin)
+        L = (target - source).reshape(-1)
+        N += B.T @ B
+        W += B.T @ L
+        n_points += source.shape[0]
+    
+    if n_points < 3:
+        raise ValueError("至少需要3个公共点进行七参数转换")
+    
+    # 一次分解同时得到参数与法方程逆阵
+    solution = np.linalg.solve(N, np.column_stack((W, np.eye(7))))
+    shifted = solution[:, 0]
+    
+    # 2. 第二遍：在线统计残差
+    count = 0
+    mean = np.zeros(3)
+    m2 = np.zeros(3)
+    v_min = np.full(3, np.inf)
+    v_max = np.full(3, -np.inf)
+    v_v = 0.0
+    for source, target in _iter_chunks(make_iter()):
+        residuals = (_design_matrix(source - origin) @ shifted - (target - source).reshape(-1)).reshape(-1, 3)
+        k = residuals.shape[0]
+        if k == 0:
+            continue
+        chunk_mean = residuals.mean(axis=0)
+        chunk_m2 = ((residuals - chunk_mean)**2).sum(axis=0)
+        
+        # Chan合并：将本块的均值与离差平方和并入累计值
+        total = count + k
+        delta = chunk_mean - mean
+        mean += delta * k / total
+        m2 += chunk_m2 + delta**2 * count * k / total
+        count = total
+        
+        v_min = np.minimum(v_min, residuals.min(axis=0))
+        v_max = np.maximum(v_max, residuals.max(axis=0))
+        v_v += np.sum(residuals**2)
+    
+    if count != n_points:
+        raise ValueError("两次遍历chunks得到的点数不一致")
+    
+    sigma0 = np.sqrt(v_v / (3 * n_points - 7))
+    std = np.sqrt(m2 / count)
+    stats = {
+        f'{axis}_stats': [v_min[i], v_max[i], mean[i], std[i]]
+        for i, axis in enumerate(('x', 'y', 'z'))
+    }
+    
+    return {
+        'parameters': _restore_translation(shifted, origin),
+        'rms': sigma0,
+        'stats': stats,
+        'n_points': n_points,
+        'covariance': _restore_covariance(solution[:, 1:], origin, sigma0)
+    }
+
+def bursa_seven_parameters_grouped(source_coords, target_coords, groups):
+    """
+    按组批量计算多套互相独立的布尔莎七参数
+    
+    各组公共点个数可以不同。所有点的法方程贡献一次算出后按组求和，
+    得到 (k,7,7) 的法方程组，由一次堆叠的 np.linalg.solve 同时解算全部组。
+    
+    参数:
+    source_coords: numpy.ndarray, shape (n,3)
+        全部组的源坐标，空间直角坐标系(XYZ)格式
+    target_coords: numpy.ndarray, shape (n,3)
+        全部组的目标坐标，空间直角坐标系(XYZ)格式
+    groups: 类数组, shape (n,)
+        各点所属组的标签(整数或字符串)，同组的点不必相邻
+    
+    返回:
+    dict: 包含以下键值:
+        'groups': numpy.ndarray, shape (k,)
+            排序后的组标签，以下按组排列的结果与之一一对应
+        'parameters': numpy.ndarray, shape (k,7)
+            各组七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+        'rms': numpy.ndarray, shape (k,)
+            各组中误差
+        'n_points': numpy.ndarray, shape (k,)
+            各组公共点个数
+        'residuals': numpy.ndarray, shape (n,3)
+            各点在其所属组参数下的残差，按输入顺序排列
+    """
+    source = np.asarray(source_coords, dtype=np.float64)
+    target = np.asarray(target_coords, dtype=np.float64)
+    if source.shape != target.shape or source.ndim != 2 or source.shape[1] != 3:
+        raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+    labels, order, starts, counts = _group_segments(groups, source.shape[0])
+    if np.any(counts < 3):
+        raise ValueError(f"每组至少需要3个公共点进行七参数转换，不足的组: {labels[counts < 3].tolist()}")
+    
+    # 1. 按组排序并重心化
+    source = source[order]
+    target = target[order]
+    centers = np.add.reduceat(source, starts, axis=0) / counts[:, np.newaxis]
+    B = _design_matrix(source - np.repeat(centers, counts, axis=0)).reshape(-1, 3, 7)
+    L = target - source
+    
+    # 2. 逐点法方程贡献按组求和，堆叠解算
+    N = np.add.reduceat(np.einsum('nki,nkj->nij', B, B), starts, axis=0)
+    W = np.add.reduceat(np.einsum('nki,nk->ni', B, L), starts, axis=0)
+    shifted = np.linalg.solve(N, W[..., np.newaxis])[..., 0]
+    
+    # 3. 还原平移参数 T = T' - K(重心)
+    parameters = shifted.copy()
+    K = _design_matrix(centers).reshape(-1, 3, 7)[:, :, 3:]
+    parameters[:, :3] -= np.einsum('kij,kj->ki', K, shifted[:, 3:])
+    
+    # 4. 残差与各组中误差
+    V = np.einsum('nki,ni->nk', B, np.repeat(shifted, counts, axis=0)) - L
+    v_v = np.add.reduceat(np.sum(V**2, axis=1), starts)
+    rms = np.sqrt(v_v / (3 * counts - 7))
+    
+    residuals = np.empty_like(V)
+    residuals[order] = V
+    
+    return {
+        'groups': labels,
+        'parameters': parameters,
+        'rms': rms,
+        'n_points': counts,
+        'residuals': residuals
     }
 
-def transform_point_seven_par(point, parameters):
+def _group_segments(groups, n_points):
+    """
+    按组标签排序，返回 (组标签, 排序索引, 各组在排序后的起始位置, 各组点数)
+    """
+    groups = np.asarray(groups)
+    if groups.shape != (n_points,):
+        raise ValueError("组标签个数必须与点数相同")
+    labels, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return labels, order, starts, counts
+
+class IncrementalSevenParameters:
+    """
+    可逐点增删公共点的布尔莎七参数解算器
+    
+    保存 7×7 法方程矩阵 N 与右端向量 W，启用/停用一个公共点只需加上/减去该点的
+    秩3贡献 BᵢᵀBᵢ、BᵢᵀLᵢ，与点数无关；之后调用 solve() 即可得到新的参数与残差。
+    源坐标在内部减去首个点的坐标后再组成误差方程，以减小地心坐标量级带来的舍入误差。
+    
+    参数:
+    source_coords: numpy.ndarray, shape (n,3), 可选
+        初始的源坐标点，空间直角坐标系(XYZ)格式
+    target_coords: numpy.ndarray, shape (n,3), 可选
+        初始的目标坐标点，空间直角坐标系(XYZ)格式
+    active: bool 或 bool数组, 初始点是否参与解算
+    """
+    
+    def __init__(self, source_coords=None, target_coords=None, active=True):
+        self._source = np.empty((0, 3))
+        self._target = np.empty((0, 3))
+        self._active = np.empty(0, dtype=bool)
+        self._size = 0
+        self._origin = None
+        self._N = np.zeros((7, 7))
+        self._W = np.zeros(7)
+        if source_coords is not None:
+            self.add_points(source_coords, target_coords, active)
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def active(self):
+        """各点是否参与解算，bool数组(副本)"""
+        return self._active[:self._size].copy()
+    
+    @property
+    def n_active(self):
+        """参与解算的公共点个数"""
+        return int(np.count_nonzero(self._active[:self._size]))
+    
+    def add_point(self, source, target, active=True):
+        """
+        增加一个公共点
+        
+        参数:
+        source: numpy.ndarray, shape (3,), 源坐标
+        target: numpy.ndarray, shape (3,), 目标坐标
+        active: bool, 是否立即参与解算
+        
+        返回:
+        int: 该点的编号，供 enable/disable 使用
+        """
+        return int(self.add_points([source], [target], active)[0])
+    
+    def add_points(self, source_coords, target_coords, active=True):
+        """
+        批量增加公共点
+        
+        返回:
+        numpy.ndarray: 新增各点的编号
+        """
+        source = np.array(source_coords, dtype=np.float64)
+        target = np.array(target_coords, dtype=np.float64)
+        if source.shape != target.shape or source.ndim != 2 or source.shape[1] != 3:
+            raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+        active = np.broadcast_to(np.asarray(active, dtype=bool), source.shape[:1])
+        
+        k = source.shape[0]
+        if self._origin is None and k > 0:
+            self._origin = source[0].copy()
+        
+        # 容量不足时按倍数扩充，均摊后每点O(1)
+        start = self._size
+        if start + k > self._source.shape[0]:
+            capacity = max(2 * self._source.shape[0], start + k, 16)
+            self._source = np.resize(self._source, (capacity, 3))
+            self._target = np.resize(self._target, (capacity, 3))
+            self._active = np.resize(self._active, capacity)
+        self._source[start:start + k] = source - self._origin if k else source
+        self._target[start:start + k] = target
+        self._active[start:start + k] = False
+        self._size += k
+        
+        indices = np.arange(start, start + k)
+        self._update(indices[active], 1)
+        return indices
+    
+    def enable(self, index):
+        """启用编号为index的公共点，O(1)"""
+        self.set_active(index, True)
+    
+    def disable(self, index):
+        """停用编号为index的公共点，O(1)"""
+        self.set_active(index, False)
+    
+    def set_active(self, index, active):
+        """设置编号为index的公共点是否参与解算，状态不变时不做任何计算"""
+        index = self._check_index(index)
+        if self._active[index] != bool(active):
+            self._update([index], 1 if active else -1)
+    
+    def rebuild(self):
+        """由当前启用的点重新累加法方程，消除多次增删积累的舍入误差"""
+        self._N[:] = 0
+        self._W[:] = 0
+        indices = np.flatnonzero(self._active[:self._size])
+        self._active[indices] = False
+        self._update(indices, 1)
+    
+    def solve(self, diagnostics=False):
+        """
+        由当前法方程解算七参数
+        
+        参数:
+        diagnostics: bool, 是否计算逐点粗差诊断量，见 bursa_seven_parameters
+        
+        返回:
+        dict: 与 bursa_seven_parameters 相同的键值('residuals'及诊断量仅含启用的点，按编号排列)，另含
+            'all_residuals': numpy.ndarray, shape (n,3)
+                全部已加入点(含停用点)在当前参数下的残差
+        """
+        n_points = self.n_active
+        if n_points < 3:
+            raise ValueError("至少需要3个公共点进行七参数转换")
+        
+        # 解算的是相对首点的参数，一次分解同时得到法方程逆阵供诊断使用
+        solution = np.linalg.solve(self._N, np.column_stack((self._W, np.eye(7))))
+        shifted = solution[:, 0]
+        parameters = _restore_translation(shifted, self._origin)
+        
+        source = self._source[:self._size]
+        target = self._target[:self._size]
+        L = (target - (source + self._origin)).reshape(-1)
+        all_residuals = (_design_matrix(source) @ shifted - L).reshape(-1, 3)
+        active = self._active[:self._size]
+        residuals = all_residuals[active]
+        
+        v_v = np.sum(residuals**2)
+        sigma0 = np.sqrt(v_v / (3 * n_points - 7))
+        stats = {
+            f'{axis}_stats': [np.min(residuals[:, i]), np.max(residuals[:, i]),
+                              np.mean(residuals[:, i]), np.std(residuals[:, i])]
+            for i, axis in enumerate(('x', 'y', 'z'))
+        }
+        
+        result = {
+            'parameters': parameters,
+            'residuals': residuals,
+            'rms': sigma0,
+            'stats': stats,
+            'covariance': _restore_covariance(solution[:, 1:], self._origin, sigma0),
+            'all_residuals': all_residuals
+        }
+        if diagnostics:
+            result.update(point_diagnostics(_design_matrix(source[active]), solution[:, 1:],
+                                            residuals.reshape(-1), sigma0, 3))
+        return result
+    
+    def _check_index(self, index):
+        index = int(index)
+        if not 0 <= index < self._size:
+            raise IndexError(f"公共点编号超出范围: {index}")
+        return index
+    
+    def _update(self, indices, sign):
+        """将indices各点的法方程贡献乘以sign后累加，并更新启用状态"""
+        indices = np.asarray(indices, dtype=np.intp)
+        if indices.size == 0:
+            return
+        source = self._source[indices]
+        B = _design_matrix(source)
+        L = (self._target[indices] - (source + self._origin)).reshape(-1)
+        self._N += sign * (B.T @ B)
+        self._W += sign * (B.T @ L)
+        self._active[indices] = sign > 0
+
+def _restore_translation(shifted, origin):
+    """
+    源坐标减去origin后解得的七参数还原为原坐标下的参数
+    
+    X' - X = T + K(X)，K对X线性，故 T = T' - K(origin)，旋转与尺度参数不变
+    """
+    parameters = shifted.copy()
+    parameters[:3] -= _design_matrix(origin[np.newaxis])[:, 3:] @ shifted[3:]
+    return parameters
+
+def _restore_covariance(Q, origin, sigma0):
+    """
+    由减去origin后的法方程逆阵Q得到原坐标下参数的协方差矩阵
+    
+    按 _restore_translation 的线性关系传播: Σ = σ0²·J·Q·Jᵀ，J = [[I, -K(origin)], [0, I]]
+    """
+    J = np.eye(7)
+    J[:3, 3:] = -_design_matrix(origin[np.newaxis])[:, 3:]
+    return sigma0**2 * (J @ Q @ J.T)
+
+def _iter_chunks(chunks):
+    """逐块检查并转换为 (k,3) 浮点数组"""
+    for source, target in chunks:
+        source = np.asarray(source, dtype=np.float64)
+        target = np.asarray(target, dtype=np.float64)
+        if source.shape != target.shape or source.ndim != 2 or source.shape[1] != 3:
+            raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+        yield source, target
+
+def _design_matrix(source):
+    """
+    构建七参数误差方程的系数矩阵，第i个点(X, Y, Z)对应第3i~3i+2行:
+        [1, 0, 0,  0,  Z, -Y, X]
+        [0, 1, 0, -Z,  0,  X, Y]
+        [0, 0, 1,  Y, -X,  0, Z]
+    """
+    X = source[:, 0]
+    Y = source[:, 1]
+    Z = source[:, 2]
+    B = np.zeros((source.shape[0], 3, 7))
+    B[:, [0, 1, 2], [0, 1, 2]] = 1  # ΔX₀, ΔY₀, ΔZ₀的系数
+    B[:, 1, 3] = -Z  # εx的系数
+    B[:, 2, 3] = Y
+    B[:, 0, 4] = Z  # εy的系数
+    B[:, 2, 4] = -X
+    B[:, 0, 5] = -Y  # εz的系数
+    B[:, 1, 5] = X
+    B[:, :, 6] = source  # m的系数
+    return B.reshape(-1, 7)
+
+def propagate_seven_par_covariance(points, parameters, covariance, point_covariance=None,
+                                   chunk_size=65536, out=None, rigorous=False):
+    """
+    将七参数的协方差(及可选的源坐标协方差)传播到转换后的坐标
+    
+    按线性化模型 X' = X + B(X)·p，转换坐标的协方差为
+        Σ' = B(X)·Σp·B(X)ᵀ + M·Σx·Mᵀ，M = (1+m)·R 为对源坐标的雅可比矩阵
+    各点的雅可比矩阵按块向量化构建，内存占用只与chunk_size有关。
+    rigorous=True 时模型为 X' = T + (1+m)·R(εx,εy,εz)·X，B 为其对平移、欧拉角与尺度的偏导，
+    用于 rigorous_seven_parameters 的结果；大旋转角下小角度雅可比会严重高估误差。
+    
+    参数:
+    points: numpy.ndarray, shape (n,3)
+        源坐标，空间直角坐标系(XYZ)格式
+    parameters: numpy.ndarray, shape (7,)
+        七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    covariance: numpy.ndarray, shape (7,7)
+        参数协方差矩阵，如 bursa_seven_parameters 返回的'covariance'
+    point_covariance: numpy.ndarray, shape (3,3) 或 (n,3,3), 可选
+        源坐标的协方差矩阵，所有点共用一个或逐点给出；为None时视源坐标无误差
+    chunk_size: int, 每块处理的点数
+    out: numpy.ndarray, shape (n,3,3), 可选
+        预分配的输出数组，结果直接写入其中
+    rigorous: bool, 是否按严密旋转矩阵模型传播，见 seven_par_matrix
+    
+    返回:
+    numpy.ndarray, shape (n,3,3)
+        转换后各点的协方差矩阵，对角线开方即为各方向中误差
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+    covariance = np.asarray(covariance, dtype=np.float64)
+    if covariance.shape != (7, 7):
+        raise ValueError("参数协方差矩阵应为(7,7)的数组")
+    n_points = points.shape[0]
+    if out is None:
+        out = np.empty((n_points, 3, 3))
+    
+    # 源坐标误差的贡献 M·Σx·Mᵀ
+    if point_covariance is not None:
+        point_covariance = np.asarray(point_covariance, dtype=np.float64)
+        if point_covariance.shape not in ((3, 3), (n_points, 3, 3)):
+            raise ValueError("源坐标协方差应为(3,3)或(n,3,3)的数组")
+        M, _ = seven_par_matrix(parameters, rigorous)
+        np.matmul(M @ point_covariance, M.T, out=out)
+    else:
+        out[...] = 0
+    
+    if rigorous:
+        # ∂X'/∂ε = (1+m)·(∂R/∂ε)·X，∂X'/∂m = R·X
+        parameters = np.ravel(parameters).astype(np.float64)
+        R = _euler_rotation(*parameters[3:6])
+        dR = (1 + parameters[6]) * _euler_derivatives(*parameters[3:6])
+    
+    # 参数误差的贡献 B·Σp·Bᵀ
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        if rigorous:
+            X = points[start:stop]
+            B = np.zeros((stop - start, 3, 7))
+            B[:, [0, 1, 2], [0, 1, 2]] = 1
+            B[:, :, 3:6] = np.einsum('kij,nj->nik', dR, X)
+            B[:, :, 6] = X @ R.T
+        else:
+            B = _design_matrix(points[start:stop]).reshape(-1, 3, 7)
+        out[start:stop] += np.einsum('nik,kl,njl->nij', B, covariance, B)
+    
+    return out
+
+def transform_point_seven_par(point, parameters, out=None, rigorous=False):
     """
     使用七参数转换单点的空间直角坐标
     
@@ -90,6 +765,9 @@ def transform_point_seven_par(point, parameters):
         源坐标系中的坐标点，必须是空间直角坐标系(XYZ)格式
     parameters: numpy.ndarray, shape (7,)
         七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    out: numpy.ndarray, shape (3,), 可选
+        预分配的输出数组，结果直接写入其中
+    rigorous: bool, 是否使用严密旋转矩阵，见 seven_par_matrix
     
     返回:
     numpy.ndarray, shape (3,)
@@ -100,20 +778,162 @@ def transform_point_seven_par(point, parameters):
     if point.shape != (3,):
         raise ValueError("输入点坐标应为包含3个元素的数组")
     
+    # 应用七参数转换
+    # X' = X₀ + (1+m)·R·X
+    M, T = seven_par_matrix(parameters, rigorous)
+    transformed_point = np.add(T, M @ point, out=out)
+    
+    return transformed_point
+
+def seven_par_matrix(parameters, rigorous=False):
+    """
+    由七参数构建转换矩阵，X' = T + M·X
+    
+    同一组参数只构建一次，重复调用直接返回缓存的只读矩阵。
+    
+    参数:
+    parameters: numpy.ndarray, shape (7,)
+        七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    rigorous: bool
+        False(默认)时R为小角度近似矩阵，与 bursa_seven_parameters 的模型一致；
+        True时R为严密旋转矩阵 Rz(εz)·Ry(εy)·Rx(εx)，与 rigorous_seven_parameters 的模型一致
+    
+    返回:
+    tuple: (M, T)
+        M: numpy.ndarray, shape (3,3), (1+m)·R
+        T: numpy.ndarray, shape (3,), 平移向量 [ΔX₀, ΔY₀, ΔZ₀]
+    """
+    return _seven_par_matrix(tuple(float(v) for v in np.ravel(parameters)), bool(rigorous))
+
+@lru_cache(maxsize=64)
+def _seven_par_matrix(parameters, rigorous):
+    if len(parameters) != 7:
+        raise ValueError("七参数应为包含7个元素的数组")
+    
     # 提取参数
     dx, dy, dz = parameters[0:3]  # 平移参数
     ex, ey, ez = parameters[3:6]  # 旋转参数
     m = parameters[6]  # 尺度因子
     
     # 构建旋转矩阵
-    R = np.array([
-        [1, -ez, ey],
-        [ez, 1, -ex],
-        [-ey, ex, 1]
-    ])
+    if rigorous:
+        R = _euler_rotation(ex, ey, ez)
+    else:
+        R = np.array([
+            [1, -ez, ey],
+            [ez, 1, -ex],
+            [-ey, ex, 1]
+        ])
     
-    # 应用七参数转换
-    # X' = X₀ + (1+m)·R·X
-    transformed_point = np.array([dx, dy, dz]) + (1 + m) * (R @ point)
+    M = (1 + m) * R
+    T = np.array([dx, dy, dz])
+    M.flags.writeable = False
+    T.flags.writeable = False
+    return M, T
+
+def invert_seven_parameters(parameters, rigorous=False):
+    """
+    求七参数的逆变换参数，用于反方向转换(如 北京54→WGS84 的参数求 WGS84→北京54)
     
-    return transformed_point
+    逆变换 X = M⁻¹·(X' - T)。rigorous=True 时结果严密；小角度模型下 M⁻¹ 不再严格是
+    (1+m)·(I+[ε]×) 的形式，取与之最接近的一组参数，误差为旋转角的二阶小量：
+    正、逆参数往返后的点位误差不超过 0.7·|ε|²·|X|，|ε| 为旋转角向量 (εx, εy, εz) 的模(弧度)。
+    地表点(|X|≈6400 km)上，|ε|=1″ 时约0.1毫米，4″ 时约1.7毫米，10″ 时约1厘米；
+    精度要求更高时应使用严密模型的参数并指定 rigorous=True。
+    
+    参数:
+    parameters: numpy.ndarray, shape (7,)
+        七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    rigorous: bool, 参数是否为严密旋转矩阵模型，见 seven_par_matrix
+    
+    返回:
+    numpy.ndarray, shape (7,)
+        逆变换的七参数
+    """
+    M, T = seven_par_matrix(parameters, rigorous)
+    M_inv = np.linalg.inv(M)
+    return _seven_parameters_from_matrix(M_inv, -M_inv @ T, rigorous)
+
+def compose_seven_parameters(*parameter_sets, rigorous=False):
+    """
+    将依次执行的多组七参数合并为一组，之后只需一次 transform_points_seven_par
+    
+    合并后的算子为 M = Mₖ···M₂·M₁，T = Mₖ···M₂·T₁ + ··· + Tₖ，
+    近似误差同 invert_seven_parameters。
+    
+    参数:
+    *parameter_sets: numpy.ndarray, shape (7,)
+        按执行顺序排列的各组七参数(第一组最先作用于源坐标)
+    rigorous: bool, 参数是否为严密旋转矩阵模型，见 seven_par_matrix
+    
+    返回:
+    numpy.ndarray, shape (7,)
+        合并后的七参数
+    """
+    if not parameter_sets:
+        raise ValueError("至少需要一组七参数")
+    M, T = seven_par_matrix(parameter_sets[0], rigorous)
+    for parameters in parameter_sets[1:]:
+        M_next, T_next = seven_par_matrix(parameters, rigorous)
+        M, T = M_next @ M, M_next @ T + T_next
+    return _seven_parameters_from_matrix(M, T, rigorous)
+
+def _seven_parameters_from_matrix(M, T, rigorous):
+    """由转换算子 X' = T + M·X 反求七参数"""
+    if rigorous:
+        scale = np.cbrt(np.linalg.det(M))
+        angles = _euler_angles(M / scale)
+    else:
+        # (1+m)·(I+[ε]×) 的迹为3(1+m)，反对称部分为(1+m)·[ε]×
+        scale = np.trace(M) / 3
+        A = (M - M.T) / (2 * scale)
+        angles = np.array([A[2, 1], A[0, 2], A[1, 0]])
+    return np.r_[T, angles, scale - 1]
+
+def transform_points_seven_par(points, parameters, out=None, rigorous=False):
+    """
+    使用七参数批量转换空间直角坐标
+    
+    参数:
+    points: numpy.ndarray, shape (n,3)，或 (X, Y, Z) 三列数组组成的元组
+        源坐标系中的坐标点，必须是空间直角坐标系(XYZ)格式
+    parameters: numpy.ndarray, shape (7,)
+        七参数 [ΔX₀, ΔY₀, ΔZ₀, εx, εy, εz, m]
+    out: 可选
+        预分配的输出，形式与points相同((n,3)数组或三列数组组成的元组)
+    rigorous: bool, 是否使用严密旋转矩阵，见 seven_par_matrix
+    
+    返回:
+    numpy.ndarray, shape (n,3)，或 (X, Y, Z) 元组(当points为元组时)
+        目标坐标系中的坐标点
+    """
+    M, T = seven_par_matrix(parameters, rigorous)
+    
+    # 分列输入：逐列线性组合，不拼接成(n,3)数组
+    if isinstance(points, tuple):
+        if len(points) != 3:
+            raise ValueError("分列输入应为 (X, Y, Z) 三个数组组成的元组")
+        X, Y, Z = (np.asarray(c, dtype=np.float64) for c in points)
+        if out is None:
+            shape = np.broadcast(X, Y, Z).shape
+            out = tuple(np.empty(shape) for _ in range(3))
+        elif any(np.may_share_memory(o, c) for o in out for c in (X, Y, Z)):
+            # 原地转换时输出覆盖输入，先算到临时数组再写入
+            for column, result in zip(out, transform_points_seven_par((X, Y, Z), parameters, rigorous=rigorous)):
+                column[...] = result
+            return tuple(column[()] for column in out)
+        for i, column in enumerate(out):
+            np.multiply(X, M[i, 0], out=column)
+            column += M[i, 1] * Y
+            column += M[i, 2] * Z
+            column += T[i]
+        return tuple(column[()] for column in out)
+    
+    # (n,3)数组输入：一次矩阵乘法完成旋转与缩放
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 0 or points.shape[-1] != 3:
+        raise ValueError("输入坐标数组格式不正确，应为(n,3)的数组")
+    transformed = np.matmul(points, M.T, out=out)
+    transformed += T
+    
+    return transformed
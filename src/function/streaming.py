@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from itertools import islice
+
+import numpy as np
+
+# 流式处理时每块的默认行数
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+def read_chunks(source, n_columns, chunk_size=DEFAULT_CHUNK_ROWS, delimiter=None, skip_header=0, comments='#'):
+    """
+    按块读取分隔符文本坐标文件的生成器，内存占用只与块大小有关，与文件大小无关
+
+    空行与注释行被跳过，每行只保留前n_columns列，多余的列忽略。
+
+    参数:
+    source: str 或 文件对象, 输入文件路径或已打开的文本文件
+    n_columns: int, 每行需要的列数
+    chunk_size: int, 每块读取的行数
+    delimiter: str, 列分隔符，为None时以任意空白分隔
+    skip_header: int, 跳过开头的行数
+    comments: str, 注释起始字符，之后的内容被忽略
+
+    生成:
+    numpy.ndarray, shape (k, n_columns), 文本数组，k ≤ chunk_size
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size必须为正整数")
+
+    with _open(source, 'r') as file:
+        lines = enumerate(file, start=1)
+        for _ in islice(lines, skip_header):
+            pass
+
+        exhausted = False
+        while not exhausted:
+            rows = []
+            exhausted = True
+            for number, line in islice(lines, chunk_size):
+                exhausted = False
+                if comments:
+                    line = line.split(comments, 1)[0]
+                line = line.strip()
+                if not line:
+                    continue
+                fields = line.split(delimiter)
+                if len(fields) < n_columns:
+                    raise ValueError(f"第{number}行至少需要{n_columns}列")
+                rows.append(fields[:n_columns])
+            if rows:
+                chunk = np.array(rows, dtype=str)
+                if delimiter is not None:
+                    chunk = np.char.strip(chunk)
+                yield chunk
+
+def write_chunks(target, chunks, delimiter=None):
+    """
+    将文本块逐块写入分隔符文本文件
+
+    参数:
+    target: str 或 文件对象, 输出文件路径或已打开的文本文件
+    chunks: iterable, 每项为 shape (k, m) 的文本数组
+    delimiter: str, 列分隔符，为None时以一个空格分隔
+
+    返回:
+    int: 写入的总行数
+    """
+    separator = ' ' if delimiter is None else delimiter
+    total = 0
+    with _open(target, 'w') as file:
+        for chunk in chunks:
+            file.writelines(separator.join(row) + '\n' for row in chunk.tolist())
+            total += len(chunk)
+    return total
+
+def stream_file(source, target, convert, n_columns, chunk_size=DEFAULT_CHUNK_ROWS,
+                delimiter=None, skip_header=0, comments='#'):
+    """
+    读取→转换→写入的流式处理：每次只有一块数据驻留在内存中
+
+    参数:
+    source: str 或 文件对象, 输入文件
+    target: str 或 文件对象, 输出文件
+    convert: callable, 接收 read_chunks 生成的文本块，返回待写出的文本块
+    n_columns, chunk_size, delimiter, skip_header, comments: 同 read_chunks
+
+    返回:
+    int: 处理的总行数
+    """
+    chunks = read_chunks(source, n_columns, chunk_size, delimiter, skip_header, comments)
+    return write_chunks(target, (convert(chunk) for chunk in chunks), delimiter)
+
+@contextmanager
+def _open(file, mode):
+    """路径则打开并在结束时关闭，已打开的文件对象原样使用且不关闭"""
+    if hasattr(file, 'read' if mode == 'r' else 'write'):
+        yield file
+    else:
+        with open(file, mode, encoding='utf-8', newline=None if mode == 'r' else '') as f:
+            yield f
@@ -314,6 +314,7 @@ class MainWindow(QMainWindow):
         
         # 清空现有表格数据
         param_page.table.setRowCount(0)
+        param_page.reset_estimator()
         
         # 处理坐标系信息
         if 'source_coordinate' in data and 'target_coordinate' in data:
@@ -359,6 +360,8 @@ class MainWindow(QMainWindow):
                 # 添加复选框
                 from PyQt5.QtWidgets import QCheckBox
                 checkbox = QCheckBox()
+                checkbox.stateChanged.connect(param_page.update_select_all_state)
+                checkbox.stateChanged.connect(param_page.on_point_toggled)
                 param_page.table.setCellWidget(row, 0, checkbox)
                 
                 # 添加源坐标
@@ -416,6 +419,7 @@ class MainWindow(QMainWindow):
         
         # 清空现有表格数据
         param_page.table.setRowCount(0)
+        param_page.reset_estimator()
         
         # 设置椭球基准
         if 'source_coordinate' in data and 'reference_system' in data['source_coordinate']:
@@ -448,6 +452,7 @@ class MainWindow(QMainWindow):
                     from PyQt5.QtWidgets import QCheckBox
                     checkbox = QCheckBox()
                     checkbox.stateChanged.connect(param_page.update_select_all_state)
+                    checkbox.stateChanged.connect(param_page.on_point_toggled)
                     param_page.table.setCellWidget(row, 0, checkbox)
                     
                     # 添加源坐标
@@ -1,14 +1,19 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
                            QPushButton, QLabel, QTableWidget, QTableWidgetItem,
-                           QLineEdit, QGroupBox, QMessageBox, QCheckBox, QComboBox)
+                           QLineEdit, QGroupBox, QMessageBox, QCheckBox, QComboBox, QInputDialog)
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 import numpy as np
-from function.four_par import calculate_four_parameters
+from function.four_par import IncrementalFourParameters
+from function.robust import robust_four_parameters
+from function.diagnostics import W_TEST_CRITICAL
 
 class FourParamPage(QWidget):
     def __init__(self):
         super().__init__()
         self.editing_row = None  # 添加编辑行的标记
+        self.estimator = None  # 上次计算得到的增量解算器，勾选公共点时直接更新结果
+        self.estimator_points = {}  # 复选框 -> (行号, 解算器中的点编号)
         self.setup_ui()
 
     def setup_ui(self):
@@ -95,7 +100,7 @@ class FourParamPage(QWidget):
         
         # 修改按钮工具栏
         button_layout = QHBoxLayout()
-        buttons = ["增加", "编辑", "删除", "计算"]
+        buttons = ["增加", "编辑", "删除", "计算", "自动选点"]
         for text in buttons:
             btn = QPushButton(text)
             if text == "增加":
@@ -106,16 +111,20 @@ class FourParamPage(QWidget):
                 btn.clicked.connect(self.on_delete_clicked)
             elif text == "计算":
                 btn.clicked.connect(self.on_calculate_clicked)
+            elif text == "自动选点":
+                btn.clicked.connect(self.on_robust_clicked)
             button_layout.addWidget(btn)
         
         # 创建数据表格
         self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        headers = ["选择", "源坐标X", "源坐标Y", "目标坐标X", "目标坐标Y"]
+        self.table.setColumnCount(6)
+        headers = ["选择", "源坐标X", "源坐标Y", "目标坐标X", "目标坐标Y", "RMS"]
         self.table.setHorizontalHeaderLabels(headers)
         
         # 设置表头点击信号连接
         self.table.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        # 直接编辑坐标单元格后增量解算器中的坐标已过期
+        self.table.itemChanged.connect(self.on_item_changed)
         
         # 调整布局比例
         layout.addLayout(ellipsoid_layout)  # 添加椭球基准选择区域
@@ -246,12 +255,16 @@ class FourParamPage(QWidget):
         checkbox = QCheckBox()
         # 连接复选框状态变化信号到更新全选状态的函数
         checkbox.stateChanged.connect(self.update_select_all_state)
+        checkbox.stateChanged.connect(self.on_point_toggled)
         self.table.setCellWidget(row, 0, checkbox)
         
         # 添加坐标值
         for col, value in enumerate(source_values + target_values, 1):
             item = QTableWidgetItem(value)
             self.table.setItem(row, col, item)
+        
+        # 新增的行需在下次计算时加入增量解算器
+        self.reset_estimator()
             
         # 清空输入框
         self.clear_inputs()
@@ -317,7 +330,8 @@ class FourParamPage(QWidget):
             QMessageBox.warning(self, "输入错误", "坐标必须是有效的数值！")
             return
         
-        # 更新表格数据
+        # 更新表格数据，已有的增量解算结果随之失效
+        self.reset_estimator()
         for col, value in enumerate(source_values + target_values, 1):
             self.table.setItem(current_row, col, QTableWidgetItem(value))
             
@@ -358,6 +372,8 @@ class FourParamPage(QWidget):
                                    QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # 行号将发生变化，已有的增量解算结果随之失效
+            self.reset_estimator()
             # 从后向前删除，避免索引变化
             for row in sorted(selected_rows, reverse=True):
                 self.table.removeRow(row)
@@ -395,35 +411,114 @@ class FourParamPage(QWidget):
             return
         
         try:
-            # 准备源坐标和目标坐标列表
-            source_points = []
-            target_points = []
-            
-            for row in selected_rows:
-                # 读取源坐标和目标坐标
-                x0 = float(self.table.item(row, 1).text())
-                y0 = float(self.table.item(row, 2).text())
-                x1 = float(self.table.item(row, 3).text())
-                y1 = float(self.table.item(row, 4).text())
-                
-                source_points.append((x0, y0))
-                target_points.append((x1, y1))
+            # 全部行都加入增量解算器，未勾选的行暂不参与解算，之后勾选时无需重新读取表格
+            self.reset_estimator()
+            estimator = IncrementalFourParameters()
+            estimator_points = {}
+            for row in range(self.table.rowCount()):
+                checkbox = self.table.cellWidget(row, 0)
+                checked = row in selected_rows
+                try:
+                    # 读取源坐标和目标坐标
+                    x0 = float(self.table.item(row, 1).text())
+                    y0 = float(self.table.item(row, 2).text())
+                    x1 = float(self.table.item(row, 3).text())
+                    y1 = float(self.table.item(row, 4).text())
+                except (ValueError, AttributeError):
+                    if checked:
+                        raise
+                    continue  # 未勾选的行数据有误时跳过，不影响本次计算
+                estimator_points[checkbox] = (row, estimator.add_point((x0, y0), (x1, y1), checked))
             
             # 计算四参数
-            params = calculate_four_parameters(source_points, target_points)
-            
-            # 更新结果显示
-            self.findChild(QLineEdit, "a_result").setText(f"{params['a']:.8f}")
-            self.findChild(QLineEdit, "b_result").setText(f"{params['b']:.8f}")
-            self.findChild(QLineEdit, "dx_result").setText(f"{params['dx']:.8f}")
-            self.findChild(QLineEdit, "dy_result").setText(f"{params['dy']:.8f}")
-            self.findChild(QLineEdit, "s_result").setText(f"{params['s']:.8f}")
-            self.findChild(QLineEdit, "theta_result").setText(f"{params['theta']:.8f} rad")
+            params = estimator.solve(diagnostics=True)
+            self.estimator = estimator
+            self.estimator_points = estimator_points
+            self.show_result(params)
             
             QMessageBox.information(self, "计算完成", "四参数计算完成！")
             
         except Exception as e:
             QMessageBox.critical(self, "计算错误", f"计算过程中发生错误：{str(e)}") 
+    
+    def show_result(self, params):
+        """显示四参数及各点的RMS值"""
+        self.findChild(QLineEdit, "a_result").setText(f"{params['a']:.8f}")
+        self.findChild(QLineEdit, "b_result").setText(f"{params['b']:.8f}")
+        self.findChild(QLineEdit, "dx_result").setText(f"{params['dx']:.8f}")
+        self.findChild(QLineEdit, "dy_result").setText(f"{params['dy']:.8f}")
+        self.findChild(QLineEdit, "s_result").setText(f"{params['s']:.8f}")
+        self.findChild(QLineEdit, "theta_result").setText(f"{params['theta']:.8f} rad")
+    
+        # 更新表格中的RMS值，未勾选的点显示其在当前参数下的残差
+        # 参与解算的点附带粗差诊断量，w检验超限的点标红
+        active_positions = {index: k for k, index in enumerate(np.flatnonzero(self.estimator.active))}
+        for row, index in self.estimator_points.values():
+            rms = np.sqrt(np.sum(params['all_residuals'][index]**2))
+            item = QTableWidgetItem(f"{rms:.4f}")
+            k = active_positions.get(index)
+            if k is not None:
+                w = params['standardized_residuals'][k]
+                loo = np.sqrt(np.sum(params['loo_residuals'][k]**2))
+                item.setToolTip(f"杠杆值: {params['leverage'][k]:.3f}\n"
+                                f"留一残差: {loo:.4f}\n"
+                                f"标准化残差w: {w[0]:.2f}, {w[1]:.2f}")
+                if np.any(np.abs(w) > W_TEST_CRITICAL):
+                    item.setBackground(QColor(255, 200, 200))
+            self.table.setItem(row, 5, item)
+    
+    def on_robust_clicked(self):
+        """处理自动选点按钮点击事件：对全部公共点做抗粗差解算，只勾选内点后重新计算"""
+        if self.table.rowCount() < 2:
+            QMessageBox.warning(self, "提示", "四参数计算至少需要2个公共点！")
+            return
+        
+        threshold, ok = QInputDialog.getDouble(self, "自动选点", "内点点位残差阈值(米)：", 0.1, 0.0, 1e6, 4)
+        if not ok:
+            return
+        
+        try:
+            source_points = []
+            target_points = []
+            for row in range(self.table.rowCount()):
+                source_points.append((float(self.table.item(row, 1).text()), float(self.table.item(row, 2).text())))
+                target_points.append((float(self.table.item(row, 3).text()), float(self.table.item(row, 4).text())))
+            
+            result = robust_four_parameters(source_points, target_points, threshold)
+        except Exception as e:
+            QMessageBox.critical(self, "计算错误", f"自动选点过程中发生错误：{str(e)}")
+            return
+        
+        # 按内点勾选公共点，再按勾选结果重新计算
+        self.reset_estimator()
+        for row, inlier in enumerate(result['inliers']):
+            checkbox = self.table.cellWidget(row, 0)
+            if checkbox:
+                checkbox.setChecked(bool(inlier))
+        self.on_calculate_clicked()
+    
+    def on_point_toggled(self, state):
+        """勾选或取消公共点时，用增量解算器立即更新四参数和RMS值"""
+        point = self.estimator_points.get(self.sender())
+        if self.estimator is None or point is None:
+            return
+        self.estimator.set_active(point[1], state == Qt.Checked)
+        if self.estimator.n_active < 2:
+            return
+        try:
+            self.show_result(self.estimator.solve(diagnostics=True))
+        except np.linalg.LinAlgError:
+            pass  # 当前所选公共点重合，保留上次结果
+    
+    def on_item_changed(self, item):
+        """坐标列(第1~4列)被修改时丢弃增量解算器；RMS列由 show_result 写入，不触发重建"""
+        if 1 <= item.column() <= 4:
+            self.reset_estimator()
+    
+    def reset_estimator(self):
+        """表格数据改变后，丢弃增量解算器，下次计算时重建"""
+        self.estimator = None
+        self.estimator_points = {}
 
     def on_header_clicked(self, logicalIndex):
         """处理表头点击事件"""
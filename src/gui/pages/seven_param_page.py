@@ -1,18 +1,23 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
                            QPushButton, QLabel, QTableWidget, QTableWidgetItem,
                            QRadioButton, QComboBox, QLineEdit, QGroupBox, QMessageBox,
-                           QCheckBox)
+                           QCheckBox, QInputDialog)
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 import re
 import numpy as np
 from function.WGS84_BLH_XYZ_xy import WGS84_BLH2XYZ, WGS84_XYZ2BLH
 from function.Beijing54_BLH_XYZ_xy import Beijing54_BLH2XYZ, Beijing54_XYZ2BLH
-from function.seven_par import bursa_seven_parameters
+from function.seven_par import IncrementalSevenParameters
+from function.robust import robust_seven_parameters
+from function.diagnostics import W_TEST_CRITICAL
 
 class SevenParamPage(QWidget):
     def __init__(self):
         super().__init__()
         self.editing_row = None  # 添加编辑行的标记
+        self.estimator = None  # 上次计算得到的增量解算器，勾选公共点时直接更新结果
+        self.estimator_points = {}  # 复选框 -> (行号, 解算器中的点编号)
         self.setup_ui()
 
     def setup_ui(self):
@@ -53,6 +58,8 @@ class SevenParamPage(QWidget):
         # 连接源坐标系单选按钮信号
         self.blh_radio1.toggled.connect(self.on_source_radio_toggled)
         self.blh_radio1.toggled.connect(lambda checked: self.unit_combo1.setVisible(checked))
+        self.blh_radio1.toggled.connect(lambda: self.reset_estimator())
+        self.coord_system1.currentIndexChanged.connect(lambda: self.reset_estimator())
         
         # 布局源坐标系控件
         source_layout.addLayout(coord_type_layout1, 0, 0, 1, 2)
@@ -98,6 +105,8 @@ class SevenParamPage(QWidget):
         # 连接目标坐标系单选按钮信号
         self.blh_radio2.toggled.connect(self.on_target_radio_toggled)
         self.blh_radio2.toggled.connect(lambda checked: self.unit_combo2.setVisible(checked))
+        self.blh_radio2.toggled.connect(lambda: self.reset_estimator())
+        self.coord_system2.currentIndexChanged.connect(lambda: self.reset_estimator())
         
         # 布局目标坐标系控件
         target_layout.addLayout(coord_type_layout2, 0, 0, 1, 2)
@@ -140,7 +149,7 @@ class SevenParamPage(QWidget):
         
         # 修改按钮工具栏
         button_layout = QHBoxLayout()
-        buttons = ["增加", "编辑", "删除", "计算"]
+        buttons = ["增加", "编辑", "删除", "计算", "自动选点"]
         for text in buttons:
             btn = QPushButton(text)
             if text == "增加":
@@ -151,6 +160,8 @@ class SevenParamPage(QWidget):
                 btn.clicked.connect(self.on_delete_clicked)
             elif text == "计算":
                 btn.clicked.connect(self.on_calculate_clicked)
+            elif text == "自动选点":
+                btn.clicked.connect(self.on_robust_clicked)
             button_layout.addWidget(btn)
         
         # 创建数据表格
@@ -162,6 +173,8 @@ class SevenParamPage(QWidget):
         
         # 设置表头点击信号连接
         self.table.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        # 直接编辑坐标单元格后增量解算器中的坐标已过期
+        self.table.itemChanged.connect(self.on_item_changed)
         
         # 调整布局比例
         layout.addLayout(top_layout, stretch=4)
@@ -397,12 +410,16 @@ class SevenParamPage(QWidget):
         checkbox = QCheckBox()
         # 连接复选框状态变化信号到更新全选状态的函数
         checkbox.stateChanged.connect(self.update_select_all_state)
+        checkbox.stateChanged.connect(self.on_point_toggled)
         self.table.setCellWidget(row, 0, checkbox)
         
         # 添加坐标值
         for col, value in enumerate(source_values + target_values, 1):
             item = QTableWidgetItem(value)
             self.table.setItem(row, col, item)
+        
+        # 新增的行需在下次计算时加入增量解算器
+        self.reset_estimator()
             
         # 清空输入框
         self.clear_inputs()
@@ -505,7 +522,8 @@ class SevenParamPage(QWidget):
                 QMessageBox.warning(self, "输入错误", "XYZ坐标必须是有效的数值！")
                 return
         
-        # 更新表格数据
+        # 更新表格数据，已有的增量解算结果随之失效
+        self.reset_estimator()
         for col, value in enumerate(source_values + target_values, 1):
             self.table.setItem(current_row, col, QTableWidgetItem(value))
             
@@ -546,6 +564,8 @@ class SevenParamPage(QWidget):
                                    QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # 行号将发生变化，已有的增量解算结果随之失效
+            self.reset_estimator()
             # 从后向前删除，避免索引变化
             for row in sorted(selected_rows, reverse=True):
                 self.table.removeRow(row)
@@ -595,6 +615,38 @@ class SevenParamPage(QWidget):
             return self.dms_to_decimal(value)
         return float(value)
 
+    def read_row_xyz(self, row, source_is_blh, target_is_blh, source_system, target_system):
+        """读取表格一行的源坐标和目标坐标，BLH格式按所选坐标系转换为XYZ"""
+        # 读取源坐标
+        source_values = [self.get_coordinate_value(row, i) for i in range(1, 4)]
+        # 读取目标坐标
+        target_values = [self.get_coordinate_value(row, i) for i in range(4, 7)]
+        
+        # 如果是BLH格式，需要转换为XYZ
+        if source_is_blh:
+            # 只对经纬度转换为弧度，高程保持不变
+            source_values = [np.radians(source_values[0]), np.radians(source_values[1]), source_values[2]]
+            # 根据坐标系选择转换函数
+            if source_system == "WGS84":
+                source_xyz = WGS84_BLH2XYZ(*source_values)
+            else:
+                source_xyz = Beijing54_BLH2XYZ(*source_values)
+        else:
+            source_xyz = source_values
+        
+        if target_is_blh:
+            # 只对经纬度转换为弧度，高程保持不变
+            target_values = [np.radians(target_values[0]), np.radians(target_values[1]), target_values[2]]
+            # 根据坐标系选择转换函数
+            if target_system == "WGS84":
+                target_xyz = WGS84_BLH2XYZ(*target_values)
+            else:
+                target_xyz = Beijing54_BLH2XYZ(*target_values)
+        else:
+            target_xyz = target_values
+        
+        return source_xyz, target_xyz
+    
     def on_calculate_clicked(self):
         """处理计算按钮点击事件"""
         # 获取选中的行
@@ -616,80 +668,127 @@ class SevenParamPage(QWidget):
             source_system = "WGS84" if "WGS-84" in self.coord_system1.currentText() else "Beijing54"
             target_system = "WGS84" if "WGS-84" in self.coord_system2.currentText() else "Beijing54"
             
-            # 准备源坐标和目标坐标数组
-            source_coords = []
-            target_coords = []
-            
-            for row in selected_rows:
-                # 读取源坐标
-                source_values = [self.get_coordinate_value(row, i) for i in range(1, 4)]
-                # 读取目标坐标
-                target_values = [self.get_coordinate_value(row, i) for i in range(4, 7)]
-                print("【七参数转换】读取表格源数据：", source_values)
-                print("【七参数转换】读取表格目标数据：", target_values)
-                
-                # 如果是BLH格式，需要转换为XYZ
-                if source_is_blh:
-                    # 只对经纬度转换为弧度，高程保持不变
-                    source_values = [np.radians(source_values[0]), np.radians(source_values[1]), source_values[2]]
-                    print("【七参数转换】源坐标（BLH）转换为弧度：", source_values)
-                    # 根据坐标系选择转换函数
-                    if source_system == "WGS84":
-                        source_xyz = WGS84_BLH2XYZ(*source_values)
-                    else:
-                        source_xyz = Beijing54_BLH2XYZ(*source_values)
-                    source_coords.append(source_xyz)
-                else:
-                    source_coords.append(source_values)
-                
-                if target_is_blh:
-                    # 只对经纬度转换为弧度，高程保持不变
-                    target_values = [np.radians(target_values[0]), np.radians(target_values[1]), target_values[2]]
-                    # 根据坐标系选择转换函数
-                    if target_system == "WGS84":
-                        print("【七参数转换】目标坐标（BLH）转换为弧度：", target_values)
-                        target_xyz = WGS84_BLH2XYZ(*target_values)
-                    else:
-                        target_xyz = Beijing54_BLH2XYZ(*target_values)
-                    target_coords.append(target_xyz)
-                else:
-                    target_coords.append(target_values)
-            
-            # 转换为numpy数组
-            source_coords = np.array(source_coords)
-            target_coords = np.array(target_coords)
-
-            print("【七参数转换】转换后的源坐标（XYZ）：\n", source_coords)
-            print("【七参数转换】转换后的目标坐标（XYZ）：\n", target_coords)
+            # 全部行都加入增量解算器，未勾选的行暂不参与解算，之后勾选时无需重新读取表格
+            self.reset_estimator()
+            estimator = IncrementalSevenParameters()
+            estimator_points = {}
+            for row in range(self.table.rowCount()):
+                checkbox = self.table.cellWidget(row, 0)
+                checked = row in selected_rows
+                try:
+                    source_xyz, target_xyz = self.read_row_xyz(
+                        row, source_is_blh, target_is_blh, source_system, target_system)
+                except (ValueError, AttributeError):
+                    if checked:
+                        raise
+                    continue  # 未勾选的行数据有误时跳过，不影响本次计算
+                estimator_points[checkbox] = (row, estimator.add_point(source_xyz, target_xyz, checked))
             
             # 计算七参数
-            result = bursa_seven_parameters(source_coords, target_coords)
-            
-            # 显示结果
-            params = result['parameters']
-            
-            # 更新结果显示
-            result_names = ['dx_result', 'dy_result', 'dz_result', 
-                           'wx_result', 'wy_result', 'wz_result', 'k_result']
-            for i, name in enumerate(result_names):
-                widget = self.findChild(QLineEdit, name)
-                if widget:
-                    if i < 3:  # DX, DY, DZ显示为米
-                        widget.setText(f"{params[i]:.8f} m")
-                    elif i < 6:  # WX, WY, WZ显示为弧度
-                        widget.setText(f"{params[i]:.8f} rad")
-                    else:  # K显示为m
-                        widget.setText(f"{params[i]:.8f} m")
-            
-            # 更新表格中的RMS值
-            for i, row in enumerate(selected_rows):
-                rms = np.sqrt(np.sum(result['residuals'][i]**2))
-                self.table.setItem(row, 7, QTableWidgetItem(f"{rms:.4f}"))
+            result = estimator.solve(diagnostics=True)
+            self.estimator = estimator
+            self.estimator_points = estimator_points
+            self.show_result(result)
             
             QMessageBox.information(self, "计算完成", "七参数计算完成！")
             
         except Exception as e:
             QMessageBox.critical(self, "计算错误", f"计算过程中发生错误：{str(e)}") 
+    
+    def show_result(self, result):
+        """显示七参数及各点的RMS值"""
+        params = result['parameters']
+        
+        # 更新结果显示
+        result_names = ['dx_result', 'dy_result', 'dz_result', 
+                       'wx_result', 'wy_result', 'wz_result', 'k_result']
+        for i, name in enumerate(result_names):
+            widget = self.findChild(QLineEdit, name)
+            if widget:
+                if i < 3:  # DX, DY, DZ显示为米
+                    widget.setText(f"{params[i]:.8f} m")
+                elif i < 6:  # WX, WY, WZ显示为弧度
+                    widget.setText(f"{params[i]:.8f} rad")
+                else:  # K显示为m
+                    widget.setText(f"{params[i]:.8f} m")
+        
+        # 更新表格中的RMS值，未勾选的点显示其在当前参数下的残差
+        # 参与解算的点附带粗差诊断量，w检验超限的点标红
+        active_positions = {index: k for k, index in enumerate(np.flatnonzero(self.estimator.active))}
+        for row, index in self.estimator_points.values():
+            rms = np.sqrt(np.sum(result['all_residuals'][index]**2))
+            item = QTableWidgetItem(f"{rms:.4f}")
+            k = active_positions.get(index)
+            if k is not None:
+                w = result['standardized_residuals'][k]
+                loo = np.sqrt(np.sum(result['loo_residuals'][k]**2))
+                item.setToolTip(f"杠杆值: {result['leverage'][k]:.3f}\n"
+                                f"留一残差: {loo:.4f}\n"
+                                f"标准化残差w: {w[0]:.2f}, {w[1]:.2f}, {w[2]:.2f}")
+                if np.any(np.abs(w) > W_TEST_CRITICAL):
+                    item.setBackground(QColor(255, 200, 200))
+            self.table.setItem(row, 7, item)
+    
+    def on_robust_clicked(self):
+        """处理自动选点按钮点击事件：对全部公共点做抗粗差解算，只勾选内点后重新计算"""
+        if self.table.rowCount() < 3:
+            QMessageBox.warning(self, "提示", "七参数计算至少需要3个公共点！")
+            return
+        
+        threshold, ok = QInputDialog.getDouble(self, "自动选点", "内点点位残差阈值(米)：", 0.1, 0.0, 1e6, 4)
+        if not ok:
+            return
+        
+        try:
+            # 获取源坐标系和目标坐标系的类型
+            source_is_blh = self.blh_radio1.isChecked()
+            target_is_blh = self.blh_radio2.isChecked()
+            source_system = "WGS84" if "WGS-84" in self.coord_system1.currentText() else "Beijing54"
+            target_system = "WGS84" if "WGS-84" in self.coord_system2.currentText() else "Beijing54"
+            
+            source_coords = []
+            target_coords = []
+            for row in range(self.table.rowCount()):
+                source_xyz, target_xyz = self.read_row_xyz(
+                    row, source_is_blh, target_is_blh, source_system, target_system)
+                source_coords.append(source_xyz)
+                target_coords.append(target_xyz)
+            
+            result = robust_seven_parameters(np.array(source_coords), np.array(target_coords), threshold)
+        except Exception as e:
+            QMessageBox.critical(self, "计算错误", f"自动选点过程中发生错误：{str(e)}")
+            return
+        
+        # 按内点勾选公共点，再按勾选结果重新计算
+        self.reset_estimator()
+        for row, inlier in enumerate(result['inliers']):
+            checkbox = self.table.cellWidget(row, 0)
+            if checkbox:
+                checkbox.setChecked(bool(inlier))
+        self.on_calculate_clicked()
+    
+    def on_point_toggled(self, state):
+        """勾选或取消公共点时，用增量解算器立即更新七参数和RMS值"""
+        point = self.estimator_points.get(self.sender())
+        if self.estimator is None or point is None:
+            return
+        self.estimator.set_active(point[1], state == Qt.Checked)
+        if self.estimator.n_active < 3:
+            return
+        try:
+            self.show_result(self.estimator.solve(diagnostics=True))
+        except np.linalg.LinAlgError:
+            pass  # 当前所选公共点几何条件不足，保留上次结果
+    
+    def on_item_changed(self, item):
+        """坐标列(第1~6列)被修改时丢弃增量解算器；RMS列由 show_result 写入，不触发重建"""
+        if 1 <= item.column() <= 6:
+            self.reset_estimator()
+    
+    def reset_estimator(self):
+        """表格数据或坐标系设置改变后，丢弃增量解算器，下次计算时重建"""
+        self.estimator = None
+        self.estimator_points = {}
 
     def on_header_clicked(self, logicalIndex):
         """处理表头点击事件"""
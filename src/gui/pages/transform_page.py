@@ -1,15 +1,15 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QPushButton, QLabel, 
                             QTableWidget, QTableWidgetItem, QComboBox, QGroupBox,
                             QRadioButton, QHBoxLayout, QLineEdit, QFrame, QSizePolicy,
-                            QMessageBox, QTabWidget)
+                            QMessageBox, QTabWidget, QCheckBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 import numpy as np
 import math
 from .seven_param_page import SevenParamPage
-from function.WGS84_BLH_XYZ_xy import WGS84_BLH2XYZ, WGS84_XYZ2BLH, WGS84_BLH2xy, WGS84_xy2BLH
-from function.Beijing54_BLH_XYZ_xy import Beijing54_BLH2XYZ, Beijing54_XYZ2BLH, Beijing54_BLH2xy, Beijing54_xy2BLH
-from function.seven_par import transform_point_seven_par
+from function.pipeline import seven_param_pipeline
+from function.seven_par import invert_seven_parameters
+from function.four_par import invert_four_parameters
 
 class TransformPage(QWidget):
     def __init__(self):
@@ -148,6 +148,11 @@ class TransformPage(QWidget):
         
         param_layout.addWidget(self.source_unit_frame, 3, 0, 1, 2)
         
+        # 反向转换：使用参数页面所求参数的逆变换(如由北京54求得的参数用于转回WGS84)
+        self.inverse_checkbox = QCheckBox("反向转换（使用逆参数）")
+        self.inverse_checkbox.setStyleSheet("QCheckBox { font-family: 'Microsoft YaHei UI'; }")
+        param_layout.addWidget(self.inverse_checkbox, 3, 2, 1, 2)
+        
         param_group.setLayout(param_layout)
         
         # 定义输入框样式
@@ -504,152 +509,31 @@ class TransformPage(QWidget):
                     QMessageBox.warning(self, "参数错误", f"无法获取七参数: {str(e)}\n请先在七参数页面计算七参数")
                     return
                 
+                if self.inverse_checkbox.isChecked():
+                    parameters = invert_seven_parameters(parameters)
                 print(f"【坐标转换】使用七参数: {parameters}")
                 
-                # 不同坐标系的转换逻辑
-                if "空间直角" in source_coord_type and "空间直角" in target_coord_type:
-                    # 空间直角坐标系到空间直角坐标系的七参数转换
-                    xyz = transform_point_seven_par(
-                        np.array([x, y, z]), parameters
-                    )
-                    result_x, result_y, result_z = xyz[0], xyz[1], xyz[2]
-                    
-                elif "空间直角" in source_coord_type:
-                    # 先进行七参数转换得到目标椭球下的空间直角坐标
-                    xyz = transform_point_seven_par(
-                        np.array([x, y, z]), parameters
-                    )
-                    
-                    # 然后根据目标坐标类型进行转换
-                    if "大地坐标" in target_coord_type:
-                        # 空间直角坐标转大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 弧度转换为度
-                        result_x, result_y, result_z = np.degrees(b), np.degrees(l), h
-                        
-                    elif "平面坐标" in target_coord_type:
-                        # 空间直角坐标转大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 然后转平面坐标
-                        central_meridian = self.get_central_meridian()
-                        if target_ellipsoid == "WGS84":
-                            y, x = WGS84_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
-                        else:  # 北京54
-                            y, x = Beijing54_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
+                # 坐标类型及椭球名称
+                source_type = self._pipeline_coord_type(source_coord_type)
+                target_type = self._pipeline_coord_type(target_coord_type)
+                source_ellipsoid = "WGS84" if source_ellipsoid == "WGS84" else "Beijing54"
+                target_ellipsoid = "WGS84" if target_ellipsoid == "WGS84" else "Beijing54"
                 
-                elif "大地坐标" in source_coord_type:
-                    # 先将大地坐标转为空间直角坐标
-                    # 如果已经在上面解析为十进制度，这里不需要再次转换
-                    if self.source_unit_dms.isChecked():
-                        # 已在上面解析为十进制度，这里转为弧度
-                        b_rad = np.radians(x)
-                        l_rad = np.radians(y)
-                    else:
-                        # 度转弧度
-                        b_rad = np.radians(x) if self.source_unit_degree.isChecked() else x
-                        l_rad = np.radians(y) if self.source_unit_degree.isChecked() else y
-                    h = z
-                    
-                    # 转换为空间直角坐标
-                    if source_ellipsoid == "WGS84":
-                        x_xyz, y_xyz, z_xyz = WGS84_BLH2XYZ(b_rad, l_rad, h)
-                    else:  # 北京54
-                        x_xyz, y_xyz, z_xyz = Beijing54_BLH2XYZ(b_rad, l_rad, h)
-                    
-                    # 进行七参数转换
-                    xyz = transform_point_seven_par(
-                        np.array([x_xyz, y_xyz, z_xyz]), parameters
-                    )
-                    
-                    # 根据目标坐标类型进行转换
-                    if "空间直角" in target_coord_type:
-                        result_x, result_y, result_z = xyz[0], xyz[1], xyz[2]
-                    elif "大地坐标" in target_coord_type:
-                        # 转换为大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 弧度转换为度
-                        result_x, result_y, result_z = np.degrees(b), np.degrees(l), h
-                            
-                    elif "平面坐标" in target_coord_type:
-                        # 转换为大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 然后转平面坐标
-                        central_meridian = self.get_central_meridian()
-                        if target_ellipsoid == "WGS84":
-                            y, x = WGS84_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
-                        else:  # 北京54
-                            y, x = Beijing54_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
+                if source_type == 'BLH':
+                    # 如果已经在上面解析为十进制度，这里直接转为弧度
+                    if self.source_unit_dms.isChecked() or self.source_unit_degree.isChecked():
+                        x, y = np.radians(x), np.radians(y)
                 
-                elif "平面坐标" in source_coord_type:
-                    # 获取中央子午线
-                    central_meridian = self.get_central_meridian()
-                    
-                    # 平面坐标转大地坐标
-                    if source_ellipsoid == "WGS84":
-                        b, l = WGS84_xy2BLH(x, y, central_meridian)
-                        h = z
-                    else:  # 北京54
-                        b, l = Beijing54_xy2BLH(x, y, central_meridian)
-                        h = z
-                    
-                    # 大地坐标转空间直角坐标
-                    if source_ellipsoid == "WGS84":
-                        x_xyz, y_xyz, z_xyz = WGS84_BLH2XYZ(b, l, h)
-                    else:  # 北京54
-                        x_xyz, y_xyz, z_xyz = Beijing54_BLH2XYZ(b, l, h)
-                    
-                    # 七参数转换
-                    xyz = transform_point_seven_par(
-                        np.array([x_xyz, y_xyz, z_xyz]), parameters
-                    )
-                    
-                    # 转换为目标坐标系
-                    if "空间直角" in target_coord_type:
-                        result_x, result_y, result_z = xyz[0], xyz[1], xyz[2]
-                    elif "大地坐标" in target_coord_type:
-                        # 转换为大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 弧度转换为度
-                        result_x, result_y, result_z = np.degrees(b), np.degrees(l), h
-                            
-                    elif "平面坐标" in target_coord_type:
-                        # 转换为大地坐标
-                        if target_ellipsoid == "WGS84":
-                            b, l, h = WGS84_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        else:  # 北京54
-                            b, l, h = Beijing54_XYZ2BLH(xyz[0], xyz[1], xyz[2])
-                        
-                        # 然后转平面坐标
-                        if target_ellipsoid == "WGS84":
-                            y, x = WGS84_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
-                        else:  # 北京54
-                            y, x = Beijing54_BLH2xy(b, l, central_meridian)
-                            result_x, result_y, result_z = x, y, h
+                # 源坐标→XYZ→七参数→XYZ→目标坐标，整条链一次完成
+                central_meridian = self.get_central_meridian()
+                result_x, result_y, result_z = seven_param_pipeline(
+                    x, y, z, parameters, source_ellipsoid, target_ellipsoid,
+                    source_type, target_type, central_meridian, central_meridian
+                )
+                
+                if target_type == 'BLH':
+                    # 弧度转换为度
+                    result_x, result_y = np.degrees(result_x), np.degrees(result_y)
                 
                 # 显示结果
                 self.target_x_output.setText(f"{result_x:.8f}")
@@ -696,6 +580,8 @@ class TransformPage(QWidget):
                     QMessageBox.warning(self, "参数错误", f"无法获取四参数: {str(e)}\n请先在四参数页面计算四参数")
                     return
                 
+                if self.inverse_checkbox.isChecked():
+                    parameters = invert_four_parameters(parameters)
                 print(f"【坐标转换】使用四参数: {parameters}")
                 
                 # 调用四参数转换函数
@@ -716,6 +602,14 @@ class TransformPage(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "计算错误", f"计算过程中发生错误: {str(e)}")
     
+    def _pipeline_coord_type(self, coord_type_text):
+        """将下拉框中的坐标类型文字映射为转换流水线的坐标类型"""
+        if "空间直角" in coord_type_text:
+            return 'XYZ'
+        if "大地坐标" in coord_type_text:
+            return 'BLH'
+        return 'xy'
+    
     def get_central_meridian(self):
         """获取中央子午线，默认为120度"""
         central_meridian_text = self.central_meridian_input.text().strip()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# function 包位于 src/ 下，以 src 为根导入，与 main.py 的运行方式一致
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
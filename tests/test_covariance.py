@@ -0,0 +1,62 @@
+"""参数协方差矩阵"""
+import numpy as np
+
+from function.four_par import calculate_four_parameters, _design_matrix as _four_design_matrix
+from function.seven_par import (bursa_seven_parameters, bursa_seven_parameters_streaming,
+                                rigorous_seven_parameters, transform_points_seven_par,
+                                propagate_seven_par_covariance, _rodrigues)
+
+def _common_points(rng, n=200):
+    return rng.uniform(-5e4, 5e4, (n, 3)) + [-2.2e6, 4.5e6, 3.9e6]
+
+def _normalized(covariance, reference):
+    d = np.sqrt(np.outer(np.diag(reference), np.diag(reference)))
+    return np.abs(covariance - reference) / d
+
+def test_four_parameter_covariance_matches_normal_inverse():
+    rng = np.random.default_rng(0)
+    source = rng.uniform(-1000, 1000, (50, 2)) + [3e6, 5e5]
+    target = source * 1.0001 + [10, 20] + rng.normal(0, 0.01, source.shape)
+    for method in ('lstsq', 'centroid'):
+        result = calculate_four_parameters(source, target, method)
+        A = _four_design_matrix(source)
+        expected = result['rms']**2 * np.linalg.inv(A.T @ A)
+        assert _normalized(result['covariance'], expected).max() < 1e-6
+
+def test_streaming_covariance_matches_batch():
+    rng = np.random.default_rng(1)
+    source = _common_points(rng)
+    target = transform_points_seven_par(source, [100, -50, 30, 1e-5, -2e-5, 3e-5, 1e-5])
+    target += rng.normal(0, 0.02, target.shape)
+    chunks = [(source[i:i+37], target[i:i+37]) for i in range(0, len(source), 37)]
+    batch = bursa_seven_parameters(source, target)
+    streaming = bursa_seven_parameters_streaming(chunks)
+    np.testing.assert_allclose(streaming['parameters'], batch['parameters'], rtol=0, atol=1e-9)
+    assert _normalized(streaming['covariance'], batch['covariance']).max() < 1e-9
+
+def test_rigorous_covariance_matches_monte_carlo():
+    rng = np.random.default_rng(2)
+    source = _common_points(rng)
+    clean = np.array([100.0, -50, 30]) + 1.00002 * source @ _rodrigues(np.array([0.2, 0.4, -0.5])).T
+    result = rigorous_seven_parameters(source, clean + rng.normal(0, 0.02, source.shape))
+    samples = np.array([
+        rigorous_seven_parameters(source, clean + rng.normal(0, 0.02, source.shape))['parameters']
+        for _ in range(1000)
+    ])
+    ratio = np.sqrt(np.diag(result['covariance']) / samples.var(axis=0, ddof=1))
+    np.testing.assert_allclose(ratio, 1, atol=0.1)
+
+def test_rigorous_point_propagation_matches_monte_carlo():
+    rng = np.random.default_rng(3)
+    source = _common_points(rng)
+    clean = np.array([100.0, -50, 30]) + 1.00002 * source @ _rodrigues(np.array([0.2, 0.4, -0.5])).T
+    result = rigorous_seven_parameters(source, clean + rng.normal(0, 0.02, source.shape))
+    points = source[:5] + [1e4, -2e4, 3e4]
+    samples = np.array([
+        transform_points_seven_par(points, rigorous_seven_parameters(
+            source, clean + rng.normal(0, 0.02, source.shape))['parameters'], rigorous=True)
+        for _ in range(1000)
+    ])
+    propagated = propagate_seven_par_covariance(points, result['parameters'], result['covariance'], rigorous=True)
+    ratio = np.sqrt(np.diagonal(propagated, axis1=1, axis2=2) / samples.var(axis=0, ddof=1))
+    np.testing.assert_allclose(ratio, 1, atol=0.1)
@@ -0,0 +1,74 @@
+"""out参数与输入为同一组数组(原地转换)时，结果应与不提供out时相同"""
+import numpy as np
+import pytest
+
+from function.geodetic import BLH2XYZ, XYZ2BLH, XYZ2BLH_ALGORITHMS
+from function.seven_par import transform_points_seven_par
+from function.four_par import transform_point_four_par, transform_points_four_par
+from function.pipeline import COORD_TYPES, seven_param_pipeline
+
+PARAMETERS = np.array([100.0, -50.0, 20.0, 1e-5, -2e-5, 3e-5, 2e-6])
+FOUR_PARAMETERS = [1.0001, 0.0001, 10.0, 20.0]
+CENTRAL_MERIDIAN = np.radians(111.0)
+
+@pytest.fixture
+def blh():
+    rng = np.random.default_rng(0)
+    n = 100
+    return (np.radians(rng.uniform(20, 50, n)), np.radians(rng.uniform(100, 120, n)), rng.uniform(0, 1000, n))
+
+def _in_place(func, inputs, *args, **kwargs):
+    columns = tuple(c.copy() for c in inputs)
+    func(*columns, *args, out=columns, **kwargs)
+    return columns
+
+def _assert_columns_equal(actual, expected):
+    for a, e in zip(actual, expected):
+        np.testing.assert_array_equal(a, e)
+
+def test_blh2xyz_in_place(blh):
+    _assert_columns_equal(_in_place(BLH2XYZ, blh, 'WGS84'), BLH2XYZ(*blh, 'WGS84'))
+
+@pytest.mark.parametrize('algorithm', XYZ2BLH_ALGORITHMS)
+def test_xyz2blh_in_place(blh, algorithm):
+    xyz = BLH2XYZ(*blh, 'WGS84')
+    expected = XYZ2BLH(*xyz, 'WGS84', algorithm=algorithm)
+    _assert_columns_equal(_in_place(XYZ2BLH, xyz, 'WGS84', algorithm=algorithm), expected)
+
+def test_transform_points_seven_par_in_place(blh):
+    xyz = BLH2XYZ(*blh, 'WGS84')
+    expected = transform_points_seven_par(xyz, PARAMETERS)
+    columns = tuple(c.copy() for c in xyz)
+    transform_points_seven_par(columns, PARAMETERS, out=columns)
+    _assert_columns_equal(columns, expected)
+    
+    points = np.column_stack(xyz)
+    expected = transform_points_seven_par(points, PARAMETERS)
+    transform_points_seven_par(points, PARAMETERS, out=points)
+    np.testing.assert_array_equal(points, expected)
+
+def test_transform_point_four_par_in_place(blh):
+    xy = (blh[0] * 1e6, blh[1] * 1e6)
+    expected = transform_point_four_par(xy, FOUR_PARAMETERS)
+    columns = tuple(c.copy() for c in xy)
+    transform_point_four_par(columns, FOUR_PARAMETERS, out=columns)
+    _assert_columns_equal(columns, expected)
+    
+    columns = tuple(c.copy() for c in xy)
+    transform_points_four_par(columns, FOUR_PARAMETERS, out=columns)
+    _assert_columns_equal(columns, expected)
+
+@pytest.mark.parametrize('source_type', COORD_TYPES)
+@pytest.mark.parametrize('target_type', COORD_TYPES)
+def test_pipeline_in_place(blh, source_type, target_type):
+    B, L, H = blh
+    if source_type == 'XYZ':
+        source = BLH2XYZ(B, L, H, 'WGS84')
+    elif source_type == 'xy':
+        source = seven_param_pipeline(B, L, H, np.zeros(7), 'WGS84', 'WGS84', 'BLH', 'xy',
+                                      target_central_meridian=CENTRAL_MERIDIAN)
+    else:
+        source = blh
+    args = (PARAMETERS, 'WGS84', 'Beijing54', source_type, target_type, CENTRAL_MERIDIAN, CENTRAL_MERIDIAN)
+    expected = seven_param_pipeline(*source, *args, chunk_size=16)
+    _assert_columns_equal(_in_place(seven_param_pipeline, source, *args, chunk_size=16), expected)
@@ -0,0 +1,26 @@
+"""Molodensky基准转换与严密往返计算的差异"""
+import numpy as np
+
+from function.geodetic import BLH2XYZ, molodensky
+
+SHIFT = np.array([-15.0, 150.0, 90.0]) * 150 / np.linalg.norm([-15.0, 150.0, 90.0])
+
+def _position_error(B, L, H):
+    result = molodensky(B, L, H, 'WGS84', 'Beijing54', SHIFT)
+    expected = np.array(BLH2XYZ(B, L, H, 'WGS84')) + SHIFT.reshape((3,) + (1,) * np.ndim(B))
+    return np.linalg.norm(np.array(BLH2XYZ(*result, 'Beijing54')) - expected, axis=0), result
+
+def test_documented_accuracy_and_polar_fallback():
+    rng = np.random.default_rng(0)
+    n = 20000
+    L = rng.uniform(-np.pi, np.pi, n)
+    H = rng.uniform(0, 5000, n)
+    for low, high, tolerance in ((0, 55, 5e-3), (55, 80, 15e-3), (80, 85, 3e-2), (85, 90, 1e-3)):
+        B = np.radians(rng.uniform(low, high, n)) * rng.choice([-1, 1], n)
+        error, (_, L_new, _) = _position_error(B, L, H)
+        assert error.max() < tolerance
+        assert np.all((L_new > -np.pi) & (L_new <= np.pi))
+
+def test_polar_fallback_for_scalars():
+    error, _ = _position_error(np.radians(89.99), 0.1, 0.0)
+    assert error < 1e-3
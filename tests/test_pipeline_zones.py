@@ -0,0 +1,30 @@
+"""目标为高斯投影平面坐标时的投影带号"""
+import numpy as np
+import pytest
+
+from coordtrans import Converter, build_parser
+from function.geodetic import BLH2xy, xy2BLH
+from function.pipeline import seven_param_pipeline
+
+PARAMETERS = np.array([100.0, -50.0, 20.0, 1e-5, -2e-5, 3e-5, 2e-6])
+
+def test_pipeline_writes_zone_numbers_for_automatic_zoning():
+    rng = np.random.default_rng(0)
+    n = 200
+    B, L, H = np.radians(rng.uniform(20, 50, n)), np.radians(rng.uniform(100, 125, n)), rng.uniform(0, 1000, n)
+    zones = np.empty(n, dtype=int)
+    x, y, h = seven_param_pipeline(B, L, H, PARAMETERS, 'WGS84', 'Beijing54', 'BLH', 'xy',
+                                   engine='kruger', chunk_size=64, zone_out=zones)
+    assert len(np.unique(zones)) > 1
+
+    Bt, Lt, _ = seven_param_pipeline(B, L, H, PARAMETERS, 'WGS84', 'Beijing54', 'BLH', 'BLH')
+    np.testing.assert_array_equal(zones, BLH2xy(Bt, Lt, 'Beijing54', return_zone=True)[2])
+    Bb, Lb = xy2BLH(x, y, 'Beijing54', zone_number=zones, engine='kruger')
+    np.testing.assert_allclose(Bb, Bt, rtol=0, atol=1e-10)
+    np.testing.assert_allclose(Lb, Lt, rtol=0, atol=1e-10)
+
+def test_cli_requires_central_meridian_for_xy_target():
+    with pytest.raises(ValueError):
+        Converter(build_parser().parse_args(['-', '--target-type', 'xy']))
+    converter = Converter(build_parser().parse_args(['-', '--target-type', 'xy', '--zone', '19']))
+    converter.close()
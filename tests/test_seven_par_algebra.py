@@ -0,0 +1,41 @@
+"""七参数逆变换与合并的精度"""
+import numpy as np
+
+from function.seven_par import (invert_seven_parameters, compose_seven_parameters,
+                                transform_points_seven_par)
+
+EARTH_RADIUS = 6.4e6
+
+def _surface_points(rng, n=500):
+    points = rng.normal(size=(n, 3))
+    return points * (EARTH_RADIUS / np.linalg.norm(points, axis=1, keepdims=True))
+
+def _random_parameters(rng, arcseconds):
+    eps = rng.normal(size=3)
+    eps *= np.radians(arcseconds / 3600) / np.linalg.norm(eps)
+    return np.r_[rng.uniform(-200, 200, 3), eps, rng.uniform(-2e-5, 2e-5)]
+
+def test_small_angle_inverse_within_documented_bound():
+    # 文档给出的往返误差上界 0.7·|ε|²·|X|
+    rng = np.random.default_rng(0)
+    points = _surface_points(rng)
+    for arcseconds in (0.5, 1.0, 4.0, 10.0, 30.0):
+        for _ in range(200):
+            parameters = _random_parameters(rng, arcseconds)
+            eps2 = np.dot(parameters[3:6], parameters[3:6])
+            forward = transform_points_seven_par(points, parameters)
+            back = transform_points_seven_par(forward, invert_seven_parameters(parameters))
+            error = np.linalg.norm(back - points, axis=1).max()
+            assert error <= 0.7 * eps2 * EARTH_RADIUS
+
+def test_rigorous_inverse_and_compose_are_exact():
+    rng = np.random.default_rng(2)
+    points = _surface_points(rng)
+    parameters = _random_parameters(rng, 3600.0)
+    inverse = invert_seven_parameters(parameters, rigorous=True)
+    forward = transform_points_seven_par(points, parameters, rigorous=True)
+    back = transform_points_seven_par(forward, inverse, rigorous=True)
+    np.testing.assert_allclose(back, points, rtol=0, atol=1e-6)
+
+    identity = compose_seven_parameters(parameters, inverse, rigorous=True)
+    np.testing.assert_allclose(identity, np.zeros(7), rtol=0, atol=1e-9)